@@ -0,0 +1,186 @@
+import time
+import threading
+
+from utilities import Animation
+from cache import load_image, load_images, import_graphics
+from startup import profiler
+
+#One asset that is only made the first time it is asked for
+#Arguments that are Lazy themselves are made first, e.g. Lazy(Animation,Lazy(load_images,'sonic/idle'),img_duration=16)
+class Lazy:
+    def __init__(self,loader,*args,**kwargs):
+        self.loader = loader
+        self.args = args
+        self.kwargs = kwargs
+
+    def load(self):
+        args = [arg.load() if isinstance(arg,Lazy) else arg for arg in self.args]
+        kwargs = {key: value.load() if isinstance(value,Lazy) else value for key,value in self.kwargs.items()}
+        return self.loader(*args,**kwargs)
+
+#Game.assets, works like the dict it replaces but nothing is decoded until it is first looked up
+#Screens call prefetch() with what the next screen needs so it is decoded on a background thread before then
+#Names ending in / stand for every asset under them, e.g. 'player/'
+class AssetManifest:
+    def __init__(self,entries):
+        self.entries = dict(entries) #name --> Lazy, or a plain value such as a sound file path
+        self.loaded = {}
+        self.lock = threading.RLock()
+        self.threads = []
+
+        #counters
+        self.load_times = {} #name --> seconds taken to make it
+
+    def __getitem__(self,name):
+        if name in self.loaded:
+            return self.loaded[name]
+
+        with self.lock:
+            if name not in self.loaded:
+                entry = self.entries[name]
+                if isinstance(entry,Lazy):
+                    start = time.perf_counter()
+                    entry = entry.load()
+                    self.load_times[name] = time.perf_counter() - start
+                    profiler.record('asset',name,self.load_times[name])
+                self.loaded[name] = entry
+            return self.loaded[name]
+
+    def __contains__(self,name):
+        return name in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self):
+        return self.entries.keys()
+
+    def items(self):
+        #Loads everything, use keys() to only look at the names
+        return [(name,self[name]) for name in self.entries]
+
+    def values(self):
+        return [self[name] for name in self.entries]
+
+    def get(self,name,default=None):
+        return self[name] if name in self.entries else default
+
+    def matching(self,names):
+        found = []
+        for name in names:
+            if name.endswith('/'):
+                found.extend(key for key in self.entries if key.startswith(name))
+            else:
+                found.append(name)
+        return found
+
+    def load(self,names):
+        for name in self.matching(names):
+            self[name]
+
+    def prefetch(self,names):
+        #Loads the assets on a background thread, anything looked up meanwhile just waits for its own turn
+        names = [name for name in self.matching(names) if name not in self.loaded]
+        if not names:
+            return None
+        thread = threading.Thread(target=self.load,args=(names,),daemon=True)
+        thread.start()
+        self.threads = [thread for thread in self.threads if thread.is_alive()] + [thread]
+        return thread
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'loaded': len(self.loaded),
+            'load ms': round(sum(self.load_times.values()) * 1000,1),
+            'prefetching': sum(thread.is_alive() for thread in self.threads),
+        }
+
+#Everything Game.assets holds; music, visuals, animation
+game_assets = {
+    'player': Lazy(load_image,'sonic/idle/idle1.png'),
+    'player/start': Lazy(Animation,Lazy(load_images,'sonic/start_run'),img_duration=12,loop=False),
+    'player/idle': Lazy(Animation,Lazy(load_images,'sonic/idle'),img_duration=16),
+    'player/walk': Lazy(Animation,Lazy(load_images,'sonic/walk'),img_duration=6),
+    'player/jog': Lazy(Animation,Lazy(load_images,'sonic/jog'),img_duration=6),
+    'player/fastjog': Lazy(Animation,Lazy(load_images,'sonic/fastjog'),img_duration=7),
+    'player/run': Lazy(Animation,Lazy(load_images,'sonic/run'),img_duration=6),
+    'player/topspeed': Lazy(Animation,Lazy(load_images,'sonic/toprun'),img_duration=6),
+    'player/jump': Lazy(Animation,Lazy(load_images,'sonic/jump'),img_duration=6),
+    'player/springjump': Lazy(Animation,Lazy(load_images,'sonic/springjump'),img_duration=6),
+    'player/lookup': Lazy(Animation,Lazy(load_images,'sonic/look_up'),img_duration=5,loop=False),
+    'player/bored': Lazy(Animation,Lazy(load_images,'sonic/bored'),img_duration=12,loop=False),
+    'player/bored1': Lazy(Animation,Lazy(load_images,'sonic/bored2'),img_duration=10,loop=False),
+    'player/crouch': Lazy(Animation,Lazy(load_images,'sonic/crouch'),img_duration=6,loop=False), 
+    'player/hurt': Lazy(Animation,Lazy(load_images,'sonic/hurt'),img_duration=4,loop=False), 
+    'player/rolling': Lazy(Animation,Lazy(load_images,'sonic/jump'),img_duration=6),   
+    'player/spindash': Lazy(Animation,Lazy(load_images,'sonic/spindash'),img_duration=4),
+    'player/die': Lazy(Animation,Lazy(load_images,'sonic/die'),img_duration=8,loop=False),
+    'spring/recoil': Lazy(Animation,Lazy(load_images,'springs'),img_duration=5,loop=False),
+    'chao/idle': Lazy(Animation,Lazy(load_images,'chao'),img_duration=14,loop=True),
+    'chao/walk': Lazy(Animation,Lazy(load_images,'chao'),img_duration=14,loop=True),
+    'enemy/idle': Lazy(Animation,Lazy(load_images,'enemies/idle'),img_duration=6,loop=True),
+    'enemy/walk':Lazy(Animation,Lazy(load_images,'enemies/walk'),img_duration=6,loop=True),
+    'ring/idle': Lazy(Animation,Lazy(import_graphics,'levels/level_data/rings/ring'),img_duration=5,loop=True),
+    'goalpost/idle': Lazy(load_image,'goalpost/goalpost1.png'),
+    'goalpost/finish': Lazy(load_image,'goalpost/goalpost7.png'),
+    'goalpost/spin': Lazy(load_images,'goalpost'),
+    'projectile': Lazy(load_image,'enemies/shoot.png'),
+    'clouds': Lazy(load_image,'cloud.png'),
+    'sound_effect/spring':"audio/sonic-spring.mp3",
+    'sound_effect/rings':"audio/sonic_ring_sound_effect.mp3",
+    'sound_effect/sonic_letsdothis': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_letsdoit.wav",
+    'sound_effect/sonic_herewego': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_herewego.wav",
+    'sound_effect/sonic_isthatit': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_isthatit.wav",
+    'sound_effect/sonic_ok': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_ok.wav",
+    'sound_effect/sonic_yeah': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yeah.wav",
+    'sound_effect/sonic_yes': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yes.wav",
+    'sound_effect/sonic_yes2': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yes2.wav",
+    'sound_effect/sonic_cool': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_cool.wav",
+    'sound_effect/sonic_woofeelingood':"audio/woo-feelin-good-sonic-unleashed.mp3",
+    'sound_effect/jump': "audio/jump.mp3",
+    'sound_effect/spindash': "audio/sonic-spindash.mp3",
+    'sound_effect/sonic_ow': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_ow.wav",
+    'sound_effect/homingdash': "audio/sonic_homingattack.mp3",
+    'sound_effect/loserings': "audio/S3K_loserings.wav",
+    'sound_effect/spindashfinish': "audio/S3K_spindashfinish.wav",
+    'sound_effect/sonic_tooeasy': "audio/sonic_tooeasy.mp3",
+    'sound_effect/enemy_kill': "audio/enemy_kill.wav",
+    'sound_effect/extra_life': "audio/sonic-extra-life.mp3",
+    'sound_effect/level_finish':"audio/sonic-level-finish.mp3",
+    'sound_effect/sonic_die': "audio/sonic-death-sound-effect.mp3",
+    'sound_effect/gameover': "audio/level_gameover.mp3",
+    'sound_effect/announcer_3': "audio/Anouncer3.wav",
+    'sound_effect/announcer_2': "audio/Anouncer2.wav",
+    'sound_effect/announcer_1': "audio/Anouncer1.wav",
+    'sound_effect/announcer_go': "audio/AnouncerGo!.wav",
+    'sound_effect/signpost': "audio/sonic-1-goal-post.mp3",
+    "beach1" : "audio/05. Neo Green Hill Zone - Act 1.mp3",
+    "beach2": "audio/06. Neo Green Hill Zone - Act 2.mp3",
+    'background/bg':Lazy(load_image,'neo_green_hill_zone_background.jpg'),
+    'background/asset': Lazy(load_image,'Leaf Forest Asset.png'),
+    'menu/button': Lazy(load_image,'menu_ui/button.png'),
+    'menu/button2': Lazy(load_image,'menu_ui/button2.png'),
+    'menu/music': "audio/A New Day.mp3",
+    'menu/bg': Lazy(load_image,"menu_ui/bg-leaf-storm.png"),
+    'menu/bg-score': Lazy(load_image,"menu_ui/score-bg.png"),
+    'menu/title': Lazy(load_image,"menu_ui/title.png"),
+    'menu/sonic': Lazy(load_image,"sonic-model.png"),
+    'menu/scoreboard_music': "audio/scoreboard.mp3",
+    'wasd': Lazy(load_image,"wasd.png"),
+    'op': Lazy(load_image,"op.png"),
+    'so': Lazy(load_image,"so.png"),
+    'o': Lazy(load_image,"o.png"),
+    'particle/leaf': Lazy(Animation,Lazy(load_images,"leaf")),
+    'emerald beach': Lazy(load_image,"e6710a5ee862197627a7acb1145d6908.jpg"),
+    'story/sonic/normal': Lazy(load_image,"sprites/sonic/normal.png"),
+    'story/sonic/determined': Lazy(load_image,"sprites/sonic/determined.png"),
+    'story/sonic/resting': Lazy(load_image,"sprites/sonic/resting.png"),
+    'story/sonic/dunno': Lazy(load_image,"sprites/sonic/dunno.png"),
+    'story/tails/normal': Lazy(load_image,"sprites/tails/normal.png"),
+    'story/tails/determined': Lazy(load_image,"sprites/tails/determined.png"),
+    'story/tails/dunno': Lazy(load_image,"sprites/tails/dunno.png"),
+}
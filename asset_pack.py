@@ -0,0 +1,182 @@
+import os
+import json
+import mmap
+import struct
+import pygame
+
+#Every decoded image and folder listing the game uses, in one file
+#File layout: magic, version, header length, json header, then the pixel data of every surface aligned to 64 bytes
+#Pixels are stored already decoded as BGRA, the same layout convert_alpha() gives, so loading one is no png decoding
+#The asset cache looks things up here first (by the same keys it uses itself) and falls back to the loose files
+#Every entry keeps the size and modification time of the files it was made from,
+#an entry whose files have changed since is not used, so edited graphics show up without rebuilding the pack
+#Which file that is comes from the asset cache (cache.source_path), load_image paths have the image folder put in front
+#An entry whose files cannot be found is never trusted, it counts as changed
+
+FORMAT_VERSION = 2
+MAGIC = b'SNCPAK'
+ALIGN = 64
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns,stat.st_size]
+
+def source_stamp(path):
+    #Size and modification time of the file, or of every file in the folder, an entry was loaded from
+    try:
+        if os.path.isdir(path):
+            return [[name] + file_stamp(os.path.join(path,name)) for name in sorted(os.listdir(path))]
+        return file_stamp(path)
+    except OSError:
+        return None
+
+def surface_entry(surface,offset):
+    return {
+        'offset': offset,
+        'size': list(surface.get_size()),
+        'alpha': bool(surface.get_flags() & pygame.SRCALPHA),
+        'colorkey': list(surface.get_colorkey()) if surface.get_colorkey() is not None else None,
+    }
+
+def write_pack(path,entries,source_path):
+    #entries --> asset cache key: surface, list of surfaces or list of names
+    #source_path(key) --> the file or folder the loader for that key read
+    #Anything else is left out, the game just loads it from the loose files as before,
+    #and so is anything whose files cannot be found as there would be no way to tell when it changes
+    index = []
+    pixels = []
+    offset = 0
+    for key,value in entries.items():
+        source = source_stamp(source_path(key))
+        if source is None:
+            continue
+        if isinstance(value,pygame.Surface):
+            kind,surfaces = 'surface',[value]
+        elif isinstance(value,(list,tuple)) and value and all(isinstance(item,pygame.Surface) for item in value):
+            kind,surfaces = 'surfaces',list(value)
+        elif isinstance(value,(list,tuple)) and all(isinstance(item,str) for item in value):
+            index.append({'key': list(key), 'type': 'names', 'names': list(value), 'source': source})
+            continue
+        else:
+            continue
+
+        items = []
+        for surface in surfaces:
+            data = pygame.image.tobytes(surface,'BGRA')
+            items.append(surface_entry(surface,offset))
+            pixels.append((offset,data))
+            offset += -(-len(data) // ALIGN) * ALIGN
+        index.append({'key': list(key), 'type': kind, 'items': items, 'source': source})
+
+    header = json.dumps({'version': FORMAT_VERSION, 'entries': index}).encode()
+    data_start = -(-(len(MAGIC) + 6 + len(header)) // ALIGN) * ALIGN
+
+    temp_path = path + '.tmp'
+    with open(temp_path,'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<HI',FORMAT_VERSION,len(header)))
+        f.write(header)
+        for start,data in pixels:
+            f.seek(data_start + start)
+            f.write(data)
+        f.truncate(data_start + offset)
+    os.replace(temp_path,path) #never leave a half written pack behind
+    return len(index)
+
+class AssetPack:
+    def __init__(self,path):
+        self.path = path
+        with open(path,'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not an asset pack')
+            version,header_size = struct.unpack('<HI',f.read(6))
+            if version != FORMAT_VERSION:
+                raise ValueError(f'{path} is version {version}, expected {FORMAT_VERSION}')
+            header = json.loads(f.read(header_size))
+
+            #Copy on write, so a surface that does get drawn on never changes the file
+            self.map = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_COPY)
+
+        self.data_start = -(-(len(MAGIC) + 6 + header_size) // ALIGN) * ALIGN
+        self.entries = {tuple(entry['key']): entry for entry in header['entries']}
+        self.view = memoryview(self.map)
+
+        #counters
+        self.stale = set() #keys of the entries that were out of date when looked up
+
+    def __contains__(self,key):
+        return key in self.entries
+
+    def surface(self,item):
+        #The surface is made straight over the mapped pixels, nothing is copied
+        width,height = item['size']
+        start = self.data_start + item['offset']
+        surface = pygame.image.frombuffer(self.view[start:start + width*height*4],(width,height),'BGRA')
+        if not item['alpha']:
+            surface = surface.convert() #opaque images go back to the display format, one copy and no decoding
+        if item['colorkey'] is not None:
+            surface.set_colorkey(item['colorkey'])
+        return surface
+
+    def get(self,key,source):
+        #Returns what the loader for this key would have, or None if it is not in the pack or is out of date
+        #source --> the file or folder the loader reads, checked against the one the entry was made from
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stamp = source_stamp(source)
+        if stamp is None or stamp != entry['source']:
+            self.stale.add(key)
+            return None
+        if entry['type'] == 'names':
+            return list(entry['names'])
+        surfaces = [self.surface(item) for item in entry['items']]
+        return surfaces[0] if entry['type'] == 'surface' else surfaces
+
+def open_pack(path):
+    #The pack if there is one, otherwise None and everything comes from the loose files
+    try:
+        return AssetPack(path)
+    except (OSError,ValueError,struct.error):
+        return None
+
+if __name__ == '__main__':
+    #python asset_pack.py --> loads every image the game and its level use from the loose files and packs them
+    #python asset_pack.py --check --> lists the entries of the pack whose files have changed since it was made
+    import sys
+    import time
+    import cache
+    from game_data import asset_pack
+    from asset_manifest import AssetManifest, game_assets
+    from loader import level_assets
+
+    pygame.init()
+    pygame.display.set_mode((1,1),pygame.HIDDEN) #convert() needs a display
+
+    if '--check' in sys.argv:
+        pack = open_pack(asset_pack['path'])
+        if pack is None:
+            sys.exit(f'no pack at {asset_pack["path"]}')
+        for key in pack.entries:
+            pack.get(key,cache.source_path(key))
+        for key in sorted(pack.stale):
+            print('changed', key[0], '(' + cache.source_path(key) + ')')
+        print(len(pack.stale), 'of', len(pack.entries), 'entries out of date', '- run asset_pack.py to rebuild the pack' if pack.stale else '')
+        sys.exit()
+    cache.asset_cache.pack_path = None #always pack from the loose files, never an old pack
+    cache.asset_cache.max_bytes = float('inf') #nothing dropped before it is packed
+
+    start = time.perf_counter()
+    AssetManifest(game_assets).values()
+    for loader,args in level_assets:
+        loader(*args)
+    print('loaded from loose files', round((time.perf_counter() - start)*1000,1), 'ms')
+
+    count = write_pack(asset_pack['path'],{key: value for key,(value,size) in cache.asset_cache.entries.items()},cache.source_path)
+    print('packed', count, 'entries into', asset_pack['path'], os.path.getsize(asset_pack['path']), 'bytes')
+
+    pack = AssetPack(asset_pack['path'])
+    start = time.perf_counter()
+    for key in pack.entries:
+        pack.get(key,cache.source_path(key))
+    print('loaded from pack', round((time.perf_counter() - start)*1000,1), 'ms')
@@ -0,0 +1,102 @@
+import os
+import time
+import hashlib
+import pygame
+
+from asset_pack import file_stamp
+
+#Sound effects already decoded into the mixer's own sample format, saved as raw PCM
+#Loading one is reading the file into a buffer, no mp3/wav decoding
+#Files are named by a hash of the source file's path, size and modification time and the mixer settings,
+#so changing any of them makes a new one, the source file itself is only read when it has to be decoded
+
+FORMAT_VERSION = 2
+cache_path = 'audio/cache'
+max_seconds = 20 #longer files are music, which is streamed by pygame.mixer.music and never cached
+
+def source_hash(sound_file,settings):
+    #Same size and modification time check the asset pack uses, one stat instead of reading the whole file
+    digest = hashlib.sha1()
+    digest.update(str(FORMAT_VERSION).encode())
+    digest.update(repr(settings).encode())
+    digest.update(repr((os.path.normpath(sound_file),file_stamp(sound_file))).encode())
+    return digest.hexdigest()
+
+def pcm_path(sound_file,settings):
+    return os.path.join(cache_path,source_hash(sound_file,settings)+'.pcm')
+
+def frame_size(settings):
+    #Bytes per sample frame, e.g. 16 bit stereo --> 4
+    frequency,format,channels = settings
+    return abs(format) // 8 * channels
+
+def read_pcm(path,settings):
+    #Returns the raw samples, or None if the file is missing or cut short
+    try:
+        with open(path,'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data or len(data) % frame_size(settings):
+        return None
+    return data
+
+def write_pcm(path,data):
+    os.makedirs(os.path.dirname(path),exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path,'wb') as f:
+        f.write(data)
+    os.replace(temp_path,path) #never leave a half written file behind
+
+def load_sound(sound_file):
+    #Same as pygame.mixer.Sound(sound_file), but from the cache if it has been decoded before
+    #A file that is not cached yet is decoded and written to the cache for next time
+    settings = pygame.mixer.get_init()
+    path = pcm_path(sound_file,settings)
+
+    data = read_pcm(path,settings)
+    if data is not None:
+        return pygame.mixer.Sound(buffer=data)
+
+    sound = pygame.mixer.Sound(sound_file)
+    write_pcm(path,sound.get_raw())
+    return sound
+
+def sound_files(folder='audio'):
+    for root,dirs,files in os.walk(folder):
+        if os.path.abspath(root).startswith(os.path.abspath(cache_path)):
+            continue
+        for name in sorted(files):
+            if name.lower().endswith(('.mp3','.wav','.ogg')):
+                yield os.path.join(root,name)
+
+def build(files):
+    #Transcodes every file that is short enough to be a sound effect, returns (file, decode ms, cached load ms) for each
+    settings = pygame.mixer.get_init()
+    results = []
+    for sound_file in files:
+        start = time.perf_counter()
+        sound = pygame.mixer.Sound(sound_file)
+        decode_time = time.perf_counter() - start
+        if sound.get_length() > max_seconds:
+            continue
+
+        path = pcm_path(sound_file,settings)
+        write_pcm(path,sound.get_raw())
+
+        start = time.perf_counter()
+        pygame.mixer.Sound(buffer=read_pcm(path,settings))
+        results.append((sound_file,decode_time*1000,(time.perf_counter() - start)*1000))
+    return results
+
+if __name__ == '__main__':
+    #python audio_cache.py --> caches every sound effect and voice clip under audio/
+    #python audio_cache.py file... --> caches just those files
+    import sys
+    pygame.mixer.pre_init()
+    pygame.mixer.init()
+    results = build(sys.argv[1:] or list(sound_files()))
+    for sound_file,decode_ms,load_ms in results:
+        print(sound_file, round(decode_ms,2), 'ms decode', round(load_ms,2), 'ms from cache')
+    print('mixer', pygame.mixer.get_init())
+    print('cached', len(results), 'files,', round(sum(result[1] for result in results),1), 'ms decode -->', round(sum(result[2] for result in results),1), 'ms from cache')
@@ -0,0 +1,124 @@
+import os
+import pygame
+import threading
+from collections import OrderedDict
+
+import support
+from asset_pack import open_pack
+from game_data import asset_pack
+
+#Process wide cache for decoded images and directory listings
+#Every entry is keyed by (path, convert mode) so the same file is only decoded once per process
+#Least recently used entries are dropped once the cache goes over its memory cap
+#The level is loaded on a background thread, so every lookup holds a lock
+#If there is an asset pack it is checked before calling the loader, see asset_pack.py
+#The pack is only opened the first time something is looked up, importing this does not touch the disk
+class AssetCache:
+    def __init__(self,max_bytes=256*1024*1024,pack_path=None):
+        self.max_bytes = max_bytes
+        self.pack_path = pack_path
+        self.pack = None
+        self.pack_opened = False
+        self.entries = OrderedDict() #key --> (value, size in bytes)
+        self.size = 0
+        self.lock = threading.RLock()
+
+        #counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.pack_hits = 0
+
+    def get(self,key,loader):
+        #Returns the cached value for the key, otherwise calls the loader and stores the result
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key) #most recently used goes to the end
+                self.hits += 1
+                return self.entries[key][0]
+
+            self.misses += 1
+            if not self.pack_opened:
+                self.pack = open_pack(self.pack_path) if self.pack_path else None
+                self.pack_opened = True
+            value = self.pack.get(key,source_path(key)) if self.pack is not None else None
+            if value is None:
+                value = loader()
+            else:
+                self.pack_hits += 1
+            size = asset_size(value)
+
+            self.entries[key] = (value,size)
+            self.size += size
+            self.evict()
+            return value
+
+    def evict(self):
+        #Drops the least recently used entries until under the memory cap
+        #Always keeps the newest entry even if it is bigger than the cap by itself
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key,(value,size) = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pack hits': self.pack_hits,
+            'pack stale': len(self.pack.stale) if self.pack is not None else 0, #python asset_pack.py --check lists them
+        }
+
+def asset_size(value):
+    #Rough memory footprint of a cached value, surfaces are counted by their pixel data
+    if isinstance(value,pygame.Surface):
+        return value.get_width() * value.get_height() * value.get_bytesize()
+    if isinstance(value,(list,tuple)):
+        return sum(asset_size(item) for item in value)
+    if isinstance(value,str):
+        return len(value)
+    return 0
+
+def source_path(key):
+    #The file or folder the loader for a cache key reads, the asset pack checks it to tell when an entry is out of date
+    #support.load_image and load_images put the image folder in front of the path they are given,
+    #the story portraits are given from the top folder already so the path is used as it is if the joined one is not there
+    path,kind = key[0],key[1]
+    if kind in ('load_image','load_images'):
+        joined = support.BASE_IMG_PATH + path
+        if os.path.exists(joined) or not os.path.exists(path):
+            return joined
+    return path
+
+asset_cache = AssetCache(pack_path=asset_pack['path'] if asset_pack['enabled'] else None)
+
+#Cached versions of the support loaders
+#The returned surfaces and lists are shared so they must not be changed by the caller
+def load_image(path):
+    return asset_cache.get((path,'load_image'), lambda: support.load_image(path))
+
+def load_images(path):
+    return asset_cache.get((path,'load_images'), lambda: support.load_images(path))
+
+def import_graphics(path):
+    return asset_cache.get((path,'graphics'), lambda: support.import_graphics(path))
+
+def import_file_names(path):
+    return asset_cache.get((path,'file_names'), lambda: support.import_file_names(path))
+
+def import_cut_graphics(path,tile_size):
+    return asset_cache.get((path,'cut',tile_size), lambda: support.import_cut_graphics(path,tile_size))
+
+def load_surface(path,alpha=True):
+    #Plain pygame.image.load of a file, converted for fast blitting
+    if alpha:
+        return asset_cache.get((path,'convert_alpha'), lambda: pygame.image.load(path).convert_alpha())
+    return asset_cache.get((path,'convert'), lambda: pygame.image.load(path).convert())
@@ -1,5 +1,7 @@
 import pygame
 
+from transform_cache import transformed
+
 class CameraGroup(pygame.sprite.Group):
     def __init__(self, displaySurface):
         super().__init__()
@@ -38,30 +40,13 @@ class CameraGroup(pygame.sprite.Group):
         self.offset.x = target.rect.centerx - (self.display_surface.get_size()[0]//2)
         self.offset.y = target.rect.centery - (self.display_surface.get_size()[1]//2)
         
-    def parallax_scroll(self,background_objects):
-        #Displays the objects in the background and moves them according to the speed of the multiplier set
-        #Moves the objects with the offset of the camera
-        for background_object in background_objects:
-            obj_image = background_object[2]
-            obj_rect = pygame.Rect(
-                background_object[1][0] - self.offset.x*background_object[0],
-                background_object[1][1] - self.offset.y*background_object[0],
-                background_object[1][2],
-                background_object[1][3]
-                )
-            if background_object[0] == 0.5: 
-                self.display_surface.blit(obj_image, obj_rect)
-                #Use this when using images
-            else:
-                self.display_surface.blit(obj_image, obj_rect)
-                
     def custom_draw(self,player):
-        self.box_camera(player)
+        #The camera is moved in Game.step(), drawing leaves it where it is
         #self.center_camera(player)
         
         for sprite in self.sprites():
             offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(pygame.transform.rotate(pygame.transform.flip(sprite.animation.img(),sprite.flip,False),sprite.angle),offset_pos)
+            self.display_surface.blit(transformed(sprite.animation.img(),sprite.flip,sprite.angle),offset_pos)
         
         
         #player.draw_sensors(self.display_surface,offset_pos)
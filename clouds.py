@@ -33,3 +33,8 @@ class Clouds:
     def render(self, surface,offset=(0,0)):
         for cloud in self.clouds:
             cloud.render(surface,offset=offset)
+
+    def draw(self,surface,offset):
+        #As a parallax layer, the clouds wrap round the screen so they are always on it and all get drawn
+        self.render(surface,offset=offset)
+        return len(self.clouds)
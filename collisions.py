@@ -40,7 +40,7 @@ class Collision:
         i,floor = pads_details #get sensor details / sensor rects and coordinates
         collide = []
 
-        for cell in level.rect_dict:  #iterate through dictionary to see if colliding with cell
+        for cell in level.terrain_grid.query_rect(floor):  #iterate through the nearby cells to see if colliding with cell
             if floor.colliderect(level.rect_dict[cell]): # if rect overlap
                 collide.append(cell)
                 pads_on[i] = True
@@ -141,8 +141,8 @@ class Collision:
         #rect collision and if positive further tests are done with masks.
         test = pygame.Rect((rect.x+offset[0],rect.y+offset[1]),rect.size)
         self.collide_ls = []
-        for cell,rec in level.rect_dict.items(): #Rect collision first - player rect and tile rect
-            if test.colliderect(rec):  #If rect collision positive, test masks.
+        for cell in level.terrain_grid.query_rect(test): #Rect collision first - player rect and nearby tile rects
+            if test.colliderect(level.rect_dict[cell]):  #If rect collision positive, test masks.
                 coord_of_rect = (cell[0],cell[1])
                 level_rect = level.rect_dict[cell] #get rect of the colliding tile
                 mask_test = test.x-level_rect[0],test.y-level_rect[1]
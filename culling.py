@@ -0,0 +1,57 @@
+import pygame
+
+from spatial import SpatialGrid
+from tiles import drawn_rect
+
+#Layers whose sprites never move, so they can be kept in a spatial grid and looked up by the view
+grid_layers = ('palmtrees_bg_animated_sprites','rings_sprites','springs_sprites')
+
+#Works out what is on screen each frame so only that gets drawn/animated
+#The view is the camera rect plus a margin, so things partly on screen or just about to come on are kept
+#Counts of visible/total objects per layer are kept for the frame, see stats()
+class Culling:
+    def __init__(self,margin=64):
+        self.margin = margin
+        self.view = pygame.Rect(0,0,0,0)
+        self.grids = {layer: SpatialGrid(64) for layer in grid_layers}
+        self.counts = {} #layer --> [visible, total] this frame
+
+    def set_view(self,camera,surface):
+        #Called once a frame before anything is drawn
+        self.view = pygame.Rect(camera.offset.x,camera.offset.y,surface.get_width(),surface.get_height()).inflate(self.margin*2,self.margin*2)
+        self.counts = {}
+
+    def add(self,layer,sprites):
+        if layer in self.grids:
+            for sprite in sprites:
+                self.grids[layer].insert(sprite,self.grid_rect(sprite))
+
+    def grid_rect(self,sprite):
+        #Palm tree images are much bigger than their 16x16 rect, so they go in by the area their frames cover
+        rect = drawn_rect(sprite)
+        for image in getattr(sprite,'frames',()):
+            rect.union_ip(image.get_rect(topleft=sprite.rect.topleft))
+        return rect
+
+    def remove(self,layer,sprites):
+        if layer in self.grids:
+            for sprite in sprites:
+                self.grids[layer].remove(sprite)
+
+    def visible_sprites(self,layer,group):
+        #Sprites of a grid layer that are on screen, skipping the ones no longer in the group (collected rings)
+        found = [sprite for sprite in self.grids[layer].query_rect(self.view) if sprite in group]
+        self.counts[layer] = [len(found),len(group)]
+        return found
+
+    def check(self,layer,rect):
+        #For things that move: tests one rect against the view and counts it for the layer
+        count = self.counts.setdefault(layer,[0,0])
+        count[1] += 1
+        if self.view.colliderect(rect):
+            count[0] += 1
+            return True
+        return False
+
+    def stats(self):
+        return {layer: tuple(count) for layer,count in self.counts.items()}
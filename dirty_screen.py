@@ -0,0 +1,91 @@
+import pygame
+
+#For menu screens where very little changes from one frame to the next
+#Only the areas that changed are redrawn and pushed to the display with display.update(rects)
+#A screen can be given in three layers:
+#background --> drawn once and kept on a surface, put back under every changed area
+#draw --> the moving things (leaves), drawn every frame, each one has to be inside one of the rects passed in
+#overlay --> (image, pos) pairs drawn over the moving things (buttons, text), only the parts inside changed areas are blitted
+#so a frame is one blits() for the background, the moving things, and one blits() for the overlay however many areas changed
+#Without a background, draw is the whole screen and is called once clipped to the box around the changed areas
+#Falls back to redrawing the whole screen on the first frame, after invalidate(), or when too much has changed
+class DirtyScreen:
+    def __init__(self,screen,max_area=0.5):
+        self.screen = screen
+        self.max_area = max_area #more than this fraction of the screen changed and the whole screen is redrawn instead
+        self.previous = [] #where the changing things were last frame, those areas need clearing
+        self.full_redraw = True
+        self.background = None #copy of the screen with only the background drawn on it
+
+        #counters
+        self.frames = 0
+        self.full_frames = 0
+
+    def invalidate(self):
+        #Next frame redraws everything, including the background, e.g. after coming back from another screen
+        self.full_redraw = True
+        self.background = None
+
+    def present(self,draw,rects,background=None,overlay=()):
+        #rects --> where the moving/changing things are this frame
+        screen_rect = self.screen.get_rect()
+        current = [pygame.Rect(rect).clip(screen_rect) for rect in rects]
+        current = [rect for rect in current if rect.width and rect.height]
+        dirty = merge_rects(self.previous + current)
+        self.previous = current
+        self.frames += 1
+
+        if background is not None and self.background is None:
+            background()
+            self.background = self.screen.copy()
+            self.full_redraw = True
+
+        area = sum(rect.width * rect.height for rect in dirty)
+        if self.full_redraw or area > self.max_area * screen_rect.width * screen_rect.height:
+            self.full_redraw = False
+            self.full_frames += 1
+            if self.background is not None:
+                self.screen.blit(self.background,(0,0))
+            draw()
+            self.screen.blits(overlay,doreturn=False)
+            pygame.display.update()
+            return
+
+        if not dirty:
+            return
+
+        if background is None:
+            self.screen.set_clip(dirty[0].unionall(dirty[1:]))
+            draw()
+            self.screen.set_clip(None)
+        else:
+            self.screen.blits([(self.background,rect,rect) for rect in dirty],doreturn=False)
+            draw()
+            self.screen.blits(clipped_blits(overlay,dirty),doreturn=False)
+        pygame.display.update(dirty)
+
+def clipped_blits(overlay,rects):
+    #The parts of each (image, pos) that are inside the rects, as blits() arguments
+    blits = []
+    for image,pos in overlay:
+        image_rect = image.get_rect(topleft=pos)
+        for rect in rects:
+            part = image_rect.clip(rect)
+            if part.width and part.height:
+                blits.append((image,part,part.move(-image_rect.x,-image_rect.y)))
+    return blits
+
+def merge_rects(rects):
+    #Joins overlapping rects so no area is drawn twice
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = 0
+        while index < len(merged):
+            if rect.colliderect(merged[index]):
+                rect.union_ip(merged.pop(index))
+                index = 0
+            else:
+                index += 1
+        merged.append(rect)
+    return merged
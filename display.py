@@ -1,56 +1,20 @@
 import pygame
 
-#This function efficiently generates a list of integer coordinates representing points on the circumference
-#of a circle with radius r using Bresenham's Circle Drawing Algorithm to optimize the calculation process
-_circle_cache = {}
-def _circlepoints(r):
-    r = int(round(r))
-    if r in _circle_cache:
-        return _circle_cache[r]
-    x, y, e = r, 0, 1 - r
-    _circle_cache[r] = points = []
-    while x >= y:
-        points.append((x, y))
-        y += 1
-        if e < 0:
-            e += 2 * y - 1
-        else:
-            x -= 1
-            e += 2 * (y - x) - 1
-    points += [(y, x) for x, y in points if x > y]
-    points += [(-x, y) for x, y in points if x]
-    points += [(x, -y) for x, y in points if y]
-    points.sort()
-    return points
-
-#Creates 2 surfaces - normal text, and text to be outlined
-# then using symmetry to centre the text on top of the outline by calling the circlepoints_ function
-def render(text, font, gfcolor=pygame.Color('white'), ocolor=(0, 0, 0), opx=2):
-    textsurface = font.render(text, True, gfcolor).convert_alpha()
-    w = textsurface.get_width() + 2 * opx
-    h = font.get_height()
-
-    osurf = pygame.Surface((w, h + 2 * opx)).convert_alpha()
-    osurf.fill((0, 0, 0, 0))
-
-    surf = osurf.copy()
-
-    osurf.blit(font.render(text, True, ocolor).convert_alpha(), (0, 0))
-
-    for dx, dy in _circlepoints(opx):
-        surf.blit(osurf, (dx + opx, dy + opx))
-
-    surf.blit(textsurface, (opx, opx))
-    return surf
+from text import render
+from startup import profiler
+
+def load_font(path,size):
+    with profiler.time('font',f'{path} {size}'):
+        return pygame.font.Font(path,size)
     
 class Display:
     def __init__(self,game):
         self.game = game
-        self.outline = pygame.font.Font("fonts/srb2-outline/srb2-outline.ttf",30)
-        self.display_font_black = pygame.font.Font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 25)
-        self.display_font_orange = pygame.font.Font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 45)
-        self.display_font_white = pygame.font.Font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 23)
-        self.display_font_large = pygame.font.Font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 57)
+        self.outline = load_font("fonts/srb2-outline/srb2-outline.ttf",30)
+        self.display_font_black = load_font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 25)
+        self.display_font_orange = load_font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 45)
+        self.display_font_white = load_font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 23)
+        self.display_font_large = load_font("fonts/sonic-1-hud-font/sonic-1-hud-font.ttf", 57)
         
         #time
         self.milliseconds = 0
@@ -65,6 +29,17 @@ class Display:
 
         #lives
         self.lives = 3
+
+        #HUD layer, only rebuilt when one of the values on it changes
+        self.hud = None
+        self.hud_values = None
+        self.hud_pos = (20,34) #topleft of the layer, the score is the top line
+
+        #counters
+        self.hud_rebuilds = 0
+        self.hud_rebuilds_per_second = 0 #rebuilds in the last full second
+        self.hud_second_start = 0
+        self.hud_second_rebuilds = 0
     
     def get_score(self,score):
         # Format score to have leading zeros
@@ -79,7 +54,7 @@ class Display:
         self.lives = int(lives)
     
     def get_time(self,time):
-        self.milliseconds = pygame.time.get_ticks() - time
+        self.milliseconds = self.game.game_clock.ticks() - time
         self.seconds = int((self.milliseconds / 1000) % 60)
         self.minutes = int(self.milliseconds / 60000)
 
@@ -87,8 +62,8 @@ class Display:
         self.seconds_str = str(self.seconds).zfill(2)
     
 
-    def ingame_display(self, screen,ring_count,score,lives,time):
-        #Displays everything onto the screen
+    def update_values(self,ring_count,score,lives,time):
+        #Keeps the time, rings, score and lives up to date
         #Checks every frame
         if not self.game.end_game:
             self.get_time(time=time)
@@ -96,9 +71,46 @@ class Display:
         self.get_score(score)
         self.get_lives(lives)
 
-        screen.blit(render(f'TIME: {self.minutes}:{self.seconds_str}', self.display_font_black), (20, 54))
-        screen.blit(render(f'RINGS: {self.ring_count_str}',self.display_font_black),(20,74))
-        screen.blit(render(f'SCORE:{self.score_str}',self.display_font_black),(20,34))
-        screen.blit(render(f'{self.lives}',self.display_font_black),(20,94))
+    def ingame_display(self, screen):
+        #Displays everything onto the screen
+        values = (self.minutes,self.seconds_str,self.ring_count_str,self.score_str,self.lives)
+        if values != self.hud_values:
+            self.hud_values = values
+            self.build_hud()
+        self.count_rebuilds()
+
+        screen.blit(self.hud,self.hud_pos)
+
+    def build_hud(self):
+        #Puts all the HUD text onto one surface, drawn in the same order and places as before
+        lines = [
+            (render(f'TIME: {self.minutes}:{self.seconds_str}', self.display_font_black), (20, 54)),
+            (render(f'RINGS: {self.ring_count_str}',self.display_font_black),(20,74)),
+            (render(f'SCORE:{self.score_str}',self.display_font_black),(20,34)),
+            (render(f'{self.lives}',self.display_font_black),(20,94)),
+        ]
+        width = max(text.get_width() + pos[0] for text,pos in lines) - self.hud_pos[0]
+        height = max(text.get_height() + pos[1] for text,pos in lines) - self.hud_pos[1]
+
+        self.hud = pygame.Surface((width,height),pygame.SRCALPHA)
+        for text,pos in lines:
+            self.hud.blit(text,(pos[0] - self.hud_pos[0], pos[1] - self.hud_pos[1]))
+
+        self.hud_rebuilds += 1
+        self.hud_second_rebuilds += 1
+
+    def count_rebuilds(self):
+        #Works out how many times the HUD was rebuilt over the last second
+        now = pygame.time.get_ticks()
+        if now - self.hud_second_start >= 1000:
+            self.hud_rebuilds_per_second = self.hud_second_rebuilds
+            self.hud_second_rebuilds = 0
+            self.hud_second_start = now
+
+    def stats(self):
+        return {
+            'hud rebuilds': self.hud_rebuilds,
+            'hud rebuilds per second': self.hud_rebuilds_per_second,
+        }
     
         
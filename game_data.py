@@ -17,6 +17,67 @@ level = {
     'chao': 'levels/level1/terrain_tiles_chao.csv',
     }
 
+#Level streaming - the level is loaded in chunks of columns around the camera
+streaming = {
+    'chunk columns': 32, #width of a chunk in csv columns (16px each)
+    'resident chunks': 6, #most chunks kept loaded at once
+    'lookahead frames': 30, #how many frames of camera movement ahead to load
+    'margin': 128, #pixels around the viewport that are always loaded
+    }
+
+#Culling - only things within this many pixels of the screen are drawn and animated
+culling_margin = 64
+
+#Flipped/rotated player frames - cached so drawing on slopes does not transform every frame
+sprite_transforms = {
+    'max entries': 2048, #most transformed frames kept
+    'angle step': 1, #angles are rounded to this many degrees, bigger shares more entries
+    'prewarm': False, #make the player frames at every tile angle while the level loads
+    }
+
+#Level building - how many worker processes build the compiled level
+#Parsing one level only takes about 40ms, and the pool was no faster (python level_compiler.py --benchmark)
+level_build = {
+    'workers': 1, #1 builds everything on one process, None uses one per core (only from python level_compiler.py)
+    }
+
+#Presenting - how the game screen is scaled up to the window each frame, see presenter.py
+presentation = {
+    'mode': 'scale', #'scale', 'smooth', 'integer', 'scaled' or 'auto', smooth blurs the pixel art so it is only used if picked here
+    'auto order': ('scale','integer'), #auto keeps the first of these that fits the budget, add 'smooth' at the front to try it
+    'budget ms': 2, #most time per frame auto allows for scaling, the display update is not counted
+    'trial frames': 30, #frames each mode is timed for on auto
+    }
+
+#Sound effects - decoded once and played on a pool of channels kept for them, see music.py
+sound_bank = {
+    'channels': 16, #mixer channels in total
+    'reserved': 12, #how many of them the sound bank manages
+    'voice limit': 2, #most copies of one effect playing at once
+    'voice limits': { #effects that need a different limit
+        'audio/sonic_ring_sound_effect.mp3': 3,
+        'audio/sonic-spindash.mp3': 1,
+        },
+    'coalesce ms': 16, #the same effect asked for again this soon is only played once (about a frame)
+    'preload': True, #decode every effect while the game starts instead of on first use
+    'pcm cache': True, #keep decoded effects in audio/cache, see audio_cache.py
+    }
+
+#Timestep - the level moves on at a fixed rate whatever rate the screen is drawn at, see timestep.py
+timestep = {
+    'tick rate': 60, #steps a second, every frame counted timer in the game expects 60
+    'display fps': 60, #most frames drawn a second, 0 for no limit
+    'max steps': 5, #most steps done before a frame is drawn, past that the game slows down instead of catching up
+    'interpolate': True, #draw the player and camera between steps, smoother when the display fps is above the tick rate
+    }
+
+#Asset pack - every image in one file read through a memory map, made by running asset_pack.py
+#Without the file the loose files are loaded as normal, and any image changed since the pack was made is loaded from its file
+asset_pack = {
+    'enabled': True,
+    'path': 'assets.pak',
+    }
+
 tile_ID = {
     '01btree4.png': '01',
     '02btree5.png': '02',
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import random
+import argparse
+import pygame
+
+#Runs the level with no window, no sound and no waiting between frames
+#Keys come from a script instead of the keyboard and time moves on exactly 1/60th of a second a frame,
+#so the same script and seed always play out the same way (see sources.py)
+#python headless.py --frames 3600 --> one minute of game time as fast as the computer can do it
+#python headless.py --script run.txt --trace trace.csv --> keys from run.txt, player position every frame into trace.csv
+
+def default_script(frames):
+    #Holds right the whole time and jumps every 2 seconds
+    script = [(0,pygame.K_d,True)]
+    for frame in range(120,frames,120):
+        script.append((frame,pygame.K_o,True))
+        script.append((frame+4,pygame.K_o,False))
+    return script
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the level headless')
+    parser.add_argument('--frames',type=int,default=3600,help='how many frames to run for (60 a second)')
+    parser.add_argument('--script',help='file of key presses, one "frame key down/up" a line')
+    parser.add_argument('--seed',type=int,default=0,help='seed for the leaves, sparks and sounds')
+    parser.add_argument('--trace',help='csv file to write the player state to every frame')
+    args = parser.parse_args()
+
+    #No window or sound card needed, has to be set before pygame starts
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init() #key names in the script can only be looked up once pygame has started
+    random.seed(args.seed)
+
+    import main as game_main
+    from sources import ScriptedInput, SimClock, load_script
+
+    script = load_script(args.script) if args.script else default_script(args.frames)
+    game = game_main.Game(ScriptedInput(script),SimClock(),headless=True)
+    game.start_loading()
+    game.finish_loading()
+    game.load_level()
+
+    trace = open(args.trace,'w') if args.trace else None
+    if trace:
+        trace.write('frame,x,y,speed,speed_y,rings,score,lives\n')
+
+    player = game.player
+    frames = 0
+    start = time.perf_counter()
+    running = True
+    while running and frames < args.frames:
+        running = game.step()
+        game.game_clock.tick()
+        frames += 1
+        if trace:
+            trace.write(f'{frames},{player.rect.x},{player.rect.y},{player.speed},{player.speed_y},{player.ring_count},{player.score},{game.lives}\n')
+    seconds = time.perf_counter() - start
+
+    if trace:
+        trace.close()
+
+    print('frames', frames, 'in', round(seconds,3), 's', '(' + str(round(frames/seconds)) + ' fps)' if seconds else '')
+    print('player', player.rect.topleft, 'rings', player.ring_count, 'score', player.score, 'lives', game.lives)
+    if not running:
+        print('level ended on frame', frames)
+
+if __name__ == '__main__':
+    sys.exit(main())
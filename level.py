@@ -1,75 +1,83 @@
 import pygame
+from collections.abc import Mapping
 
-from tiles import  StaticTile, Rings, PalmtreeAnimated, TerrainTile,Spring, GoalPost
+from tiles import  StaticTile, Rings, PalmtreeAnimated, TerrainTile, TerrainTileType, Spring, GoalPost
 from utilities import tile_size
-from game_data import tile_angles
+from game_data import tile_angles, culling_margin, streaming as level_streaming
 from camera import *
+from spatial import SpatialGrid
+from streaming import LevelStreamer
+from static_layers import StaticLayers
+from culling import Culling
 from player import PhysicsEntity, Chao, Enemy
-from support import import_csv_layout, import_cut_graphics, import_graphics, import_file_names, load_image
+from level_compiler import load_compiled_level
+from cache import import_cut_graphics, import_graphics, load_image
+
+#Read only dictionary over the placed terrain tiles, keyed by the topleft of each tile
+#The value is looked up on the tile when asked for, so nothing is copied per tile
+class TerrainView(Mapping):
+    def __init__(self,cells,value):
+        self.cells = cells #(x,y) --> TerrainTile
+        self.value = value #function taking a TerrainTile and returning the value to give back
+
+    def __getitem__(self,key):
+        return self.value(self.cells[key])
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self):
+        return len(self.cells)
 
 class Level:
-    def __init__(self,game,level_data,surface):
+    def __init__(self,game,level_data,surface,streaming=None):
         #general setup
         self.display_surface = surface
         self.cell_size = (tile_size, tile_size)
         self.game = game
         self.level_data = level_data
 
-        self.terrain_filename_list = []
+        #compiled csv layers and terrain tile metadata, rebuilt automatically when out of date
+        self.compiled = load_compiled_level(level_data)
+
+        #one shared entry per terrain tile image, placed tiles only keep their rect and a reference to it
+        self.tile_types = self.create_tile_types()
+
+        #Every layer of the level: (csv layer, tile type, sprite group)
+        self.layers = [
+            ('terrain','terrain','terrain_sprites'), #layer number 6
+            ('grass fg','grass','grass_sprites'), #layer number 4
+            ('background tiles','background tiles','background_tile_sprites'), #layer number 11
+            ('background sand','background sand','background_sand_sprites'), #layer number 23
+            ('assets','assets','assets_sprites'), #layer number 8
+            ('rings','rings','rings_sprites'),
+            ('springs','spring','springs_sprites'),
+            ('chao','chao','chao_sprites'),
+            ('setup','goalpost','goalpost_sprite'),
+            ('enemies','enemy','enemy_sprites'),
+            ('palmtrees bg static','palmtrees static','palmtrees_bg_static_sprites'), #palmtrees - seperated into static and animated 
+            ('palmtrees bg animated','palmtrees animated','palmtrees_bg_animated_sprites'),
+        ]
+
+        #The sprite groups only hold the chunks of the level that are loaded around the camera
+        for layer,type,attribute in self.layers:
+            setattr(self,attribute,pygame.sprite.Group())
 
-        #terrain setup - layer number 6
-        #rect/mask dictionary
-        terrain_layout = import_csv_layout(level_data['terrain'])
-        self.terrain_sprites = self.create_tile_group(terrain_layout,'terrain')
+        #terrain rect/mask dictionary, filled in as terrain chunks are loaded
+        self.terrain_cells = {}
+        self.terrain_grid = SpatialGrid(64)
         self.rect_dict = self.create_rect_dictionary()
         self.height_dict = self.create_height_dictionary()
         self.mask_dict = self.create_mask_dictionary()
         self.angle_dict = self.create_angle_dictionary()
 
-        #grass setup - layer number 4
-        grass_layout = import_csv_layout(level_data['grass fg'])
-        self.grass_sprites = self.create_tile_group(grass_layout, 'grass')
-
-        #background tiles - layer number 11
-        background_tiles_layout = import_csv_layout(level_data['background tiles'])
-        self.background_tile_sprites = self.create_tile_group(background_tiles_layout, 'background tiles')
-
-        #background sand tiles - layer number 23
-        background_sand_tiles_layout = import_csv_layout(level_data['background sand'])
-        self.background_sand_sprites = self.create_tile_group(background_sand_tiles_layout,'background sand')
-
-        #assets tiles - layer number 8
-        assets_layout = import_csv_layout(level_data['assets'])
-        self.assets_sprites = self.create_tile_group(assets_layout, 'assets')
-
-        #rings tiles
-        rings_layout = import_csv_layout(level_data['rings'])
-        self.rings_sprites = self.create_tile_group(rings_layout, 'rings')
-        #self.setup_level(level_data)
-
-        #springs
-        springs_layout = import_csv_layout(level_data['springs'])
-        self.springs_sprites = self.create_tile_group(springs_layout,'spring')
-
-        #chao
-        chao_layout = import_csv_layout(level_data['chao'])
-        self.chao_sprites = self.create_tile_group(chao_layout,'chao')
-
-        #goalpost
-        goalpost_layout = import_csv_layout(level_data['setup'])
-        self.goalpost_sprite = self.create_tile_group(goalpost_layout,'goalpost')
+        #static layers are drawn from surfaces baked per chunk when the chunk is loaded
+        self.static_layers = StaticLayers(self)
+        #only what is on screen gets drawn, see Culling.stats() for the visible/total counts
+        self.culling = Culling(culling_margin)
+        self.streamer = LevelStreamer(self,streaming or level_streaming)
 
-        #enemy
-        enemy_layout = import_csv_layout(level_data['enemies'])
-        self.enemy_sprites = self.create_tile_group(enemy_layout,'enemy')
-
-        #palmtrees - seperated into static and animated 
-        palmtrees_bg_static_layout = import_csv_layout(level_data['palmtrees bg static'])
-        self.palmtrees_bg_static_sprites = self.create_tile_group(palmtrees_bg_static_layout, 'palmtrees static')
-        palmtrees_bg_animated_layout = import_csv_layout(level_data['palmtrees bg animated'])
-        self.palmtrees_bg_animated_sprites = self.create_tile_group(palmtrees_bg_animated_layout, 'palmtrees animated')
-
-    def create_tile_group(self,layout,type):
+    def create_tile_group(self,layout,type,first_column=0):
         sprite_group = pygame.sprite.Group()
 
         #Goes through each of the csv layout
@@ -77,25 +85,17 @@ class Level:
         #Use Tile ID to index the tile meant to be placed there in another array
         #Create object of the tile
         #Append to sprite group 
+        #first_column is where the layout starts in the whole level when only a chunk of it is passed
         
-        for row_index,row in enumerate(layout):
-            for col_index,val in enumerate(row):
-                if val != '-1':
+        for row_index,row in enumerate(layout.tolist()):
+            for col_index,val in enumerate(row,first_column):
+                if val != -1:
                     x = col_index * tile_size
                     y = row_index * tile_size
 
                     if type == 'terrain': 
-                        terrain_tile_list_image = import_graphics('levels/level_data/tiles') 
-                        terrain_image_list_names = import_file_names('levels/level_data/tiles')
-                        
-                        tile_surface = terrain_tile_list_image[int(val)]
-                        tile_filename = terrain_image_list_names[int(val)]
-                        
-                        #For reference only -----
-                        self.terrain_filename_list.append((tile_filename, (x,y)))
-                        #----------------------------------------
-                         
-                        sprite = TerrainTile(64,x,y-48,tile_surface,tile_filename)
+                        tile_type = self.tile_types[int(val)]
+                        sprite = TerrainTile(64,x,y-48,tile_type)
                     
                     if type == 'grass':
                         grass_tile_list = import_graphics('levels/level_data/deco/grass_deco')
@@ -146,19 +146,19 @@ class Level:
                     if type == 'enemy':
                         image = load_image('enemies/idle/left_stand1.png')
                         sprite = Enemy(self.game,(x,y),(20,20),image)
+
+                    sprite.spawn_key = (type,row_index,col_index) #where in the csv it came from
                     sprite_group.add(sprite)
         
         return sprite_group
     
     def reset_entity(self):
-        #Simply resets the positions of the tiles by reading the csv files from the beginning again
-        #rings tiles
-        rings_layout = import_csv_layout(self.level_data['rings'])
-        self.rings_sprites = self.create_tile_group(rings_layout, 'rings')
-        
-        #enemy
-        enemy_layout = import_csv_layout(self.level_data['enemies'])
-        self.enemy_sprites = self.create_tile_group(enemy_layout,'enemy')
+        #Resets the rings and enemies back to where they spawned, reusing the sprites already made
+        self.streamer.reset_entities()
+
+    def stream(self,camera):
+        #Loads the chunks the camera is reaching and evicts the ones left far behind
+        self.streamer.update(camera)
     
     def reset_entity_pos(self,layout,type):
         sprite_group = pygame.sprite.Group()
@@ -181,98 +181,79 @@ class Level:
         return sprite_group
     
     
+    def create_tile_types(self):
+        #Builds the shared data for every terrain tile image from the compiled level
+        images = import_graphics('levels/level_data/tiles')
+        heights = self.compiled.tile_heights()
+        widths = self.compiled.tile_widths()
+        angles = self.compiled.tile_angles()
+        masks = self.compiled.tile_masks()
+
+        tile_types = []
+        for index,name in enumerate(self.compiled.tile_names):
+            tile_types.append(TerrainTileType(index,name,images[index],heights[index],widths[index],angles[index],masks[index]))
+        return tile_types
+    
     def create_rect_dictionary(self):
-        #creates rects for each sprite in the terrain tiles
+        #rect for each sprite in the terrain tiles
         #This will be used for collision detection
-        
-        rect_dict = {}
-        for tile in self.terrain_sprites:
-            x,y = tile.get_tile_id()[0][0], tile.get_tile_id()[0][1]
-            rect_dict[(x,y)] = tile.get_tile_id()[0] #Rect val
-        
-        return rect_dict
+        return TerrainView(self.terrain_cells, lambda tile: tile.rect)
     
     def create_height_dictionary(self):
-        #Creates height dict for each sprite in the terrain tiles
+        #height map for each sprite in the terrain tiles, shared per tile image
         #This will be used for player positioning on terraformed tiles
-        
-        height_dict = {}
-        for tile in self.terrain_sprites:
-            x,y = tile.get_tile_id()[0][0], tile.get_tile_id()[0][1]
-            height_dict[(x,y)] = tile.get_tile_id()[1] #Height val
-        
-        return height_dict
+        return TerrainView(self.terrain_cells, lambda tile: tile.tile_type.height_map)
         
     def create_mask_dictionary(self):
-        #Creates mask dict for each sprite in the terrain tiles
+        #mask for each sprite in the terrain tiles, shared per tile image
         #This will be used in collision detection
-        
-        mask_dict = {}
-        for tile in self.terrain_sprites:
-            x,y = tile.get_tile_id()[0][0], tile.get_tile_id()[0][1]
-            mask_dict[(x,y)] = pygame.mask.from_surface(tile.image) #Ripping mask from image
-        
-        return mask_dict
+        return TerrainView(self.terrain_cells, lambda tile: tile.tile_type.mask)
     
     def create_angle_dictionary(self):
-        #Creates angle dict for each sprite in the terrain tiles
+        #angle array for each sprite in the terrain tiles, shared per tile image
         #This will be used for player positioning on terraformed tiles
         #Also will be used for player mechanics (rolling up/down slopes)
-        
-        angle_dict = {}
-        for tile in self.terrain_sprites:
-            x,y = tile.get_tile_id()[0][0], tile.get_tile_id()[0][1]
-            angle_dict[(x,y)] = tile.get_tile_id()[2] # angle array
-
-        return angle_dict
+        return TerrainView(self.terrain_cells, lambda tile: tile.tile_type.angle_array)
 
     def solid_check(self,pos):
         #Checks if the tiles around the passed position of the target exist and if they are solid
         #If not, it is air and cannot collide with air
         
-        for rect_key, rect_value in self.rect_dict.items():
-            if rect_value.collidepoint(pos):
+        for rect_key in self.terrain_grid.query_point(pos):
+            if self.rect_dict[rect_key].collidepoint(pos):
                 return True
         return False
 
+    def animate(self, camera):
+        #Moves the animated tiles on by one frame, called once a game step so they go at the same speed at any frame rate
+        #Animated ones off screen are not animated
+        self.culling.set_view(camera,self.display_surface)
+
+        for tile in self.culling.visible_sprites('palmtrees_bg_animated_sprites',self.palmtrees_bg_animated_sprites):
+            tile.animate_slower()
+        for tile in self.culling.visible_sprites('rings_sprites',self.rings_sprites):
+            tile.animate()
+
     def update(self, camera):
         #Updates position of all layers onto screen to move with camera - level traversal
+        #Only the tiles on screen are drawn
+        self.culling.set_view(camera,self.display_surface)
         
-        for tile in self.background_tile_sprites:
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
-        
-        for tile in self.background_sand_sprites:
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
+        #background tiles and sand
+        self.static_layers.draw('lower',camera)
 
-        for tile in self.palmtrees_bg_animated_sprites:
-            tile.animate_slower()
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
-                
-        for tile in self.palmtrees_bg_static_sprites:
+        for tile in self.culling.visible_sprites('palmtrees_bg_animated_sprites',self.palmtrees_bg_animated_sprites):
             tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
             self.display_surface.blit(tile.image, tile_position)
 
-        for tile in self.terrain_sprites:
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
+        #static palm trees, terrain, grass and assets
+        self.static_layers.draw('upper',camera)
 
-        for tile in self.grass_sprites:
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
-            
-        for tile in self.assets_sprites:
-            tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
-            self.display_surface.blit(tile.image, tile_position)
-
-        for tile in self.rings_sprites:
-            tile.animate()
+        for tile in self.culling.visible_sprites('rings_sprites',self.rings_sprites):
             tile_position = (tile.rect.x - camera.offset.x, tile.rect.y - camera.offset.y)
             self.display_surface.blit(tile.image, tile_position)
         
-        for spring in self.springs_sprites:
+        for spring in self.culling.visible_sprites('springs_sprites',self.springs_sprites):
             tile_position = (spring.rect.x - camera.offset.x, spring.rect.y - camera.offset.y)
             self.display_surface.blit(spring.image, tile_position)
         
@@ -0,0 +1,233 @@
+import os
+import csv
+import json
+import time
+import struct
+import threading
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy
+import pygame
+
+from game_data import tile_angles, level_build
+from tiles import height_map_from_alpha, height_threshold
+from cache import import_file_names
+
+#Compiles the csv layers of a level and the terrain tile metadata into one binary file
+#File layout: magic, version, header length, json header, then every array aligned to 64 bytes
+#The header keeps the content hash of everything the file was built from so a stale file is rebuilt
+
+FORMAT_VERSION = 2
+MAGIC = b'SNCLVL'
+ALIGN = 64
+
+tiles_path = 'levels/level_data/tiles'
+compiled_path = 'levels/compiled'
+
+terrain_tile_size = 64
+mask_threshold = 127 #same alpha threshold pygame.mask.from_surface uses
+
+def read_csv_layer(path):
+    #Parses a csv layer straight into a grid of tile ids, -1 being an empty cell
+    with open(path) as f:
+        rows = [[int(val) for val in row] for row in csv.reader(f) if row]
+
+    width = max(len(row) for row in rows) if rows else 0
+    layer = numpy.full((len(rows),width),-1,dtype=numpy.int16)
+    for row_index,row in enumerate(rows):
+        layer[row_index,:len(row)] = row
+    return layer
+
+def tile_metadata(path,name):
+    #Height map, width map, angle array, solidity and packed mask bits of one terrain tile image
+    alpha = numpy.zeros((terrain_tile_size,terrain_tile_size),dtype=numpy.uint8)
+    image_alpha = pygame.surfarray.array_alpha(pygame.image.load(path))[:terrain_tile_size,:terrain_tile_size]
+    alpha[:image_alpha.shape[0],:image_alpha.shape[1]] = image_alpha
+
+    height = height_map_from_alpha(alpha,terrain_tile_size)
+    width = height_map_from_alpha(alpha.T,terrain_tile_size)
+    angles = tile_angles.get(name,[0]*terrain_tile_size)
+    solid = (alpha > height_threshold).any()
+    mask = numpy.packbits(alpha.T > mask_threshold) #packed row by row
+
+    return height,width,angles,solid,mask
+
+def content_hash(level_data):
+    #Hash of every file the compiled level depends on
+    digest = hashlib.sha1()
+    digest.update(str(FORMAT_VERSION).encode())
+    digest.update(repr(sorted(tile_angles.items())).encode())
+
+    for key in sorted(level_data):
+        digest.update(key.encode())
+        with open(level_data[key],'rb') as f:
+            digest.update(f.read())
+
+    for name in import_file_names(tiles_path):
+        digest.update(name.encode())
+        with open(os.path.join(tiles_path,name),'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+def artifact_path(level_data):
+    #levels/level1/terrain_tiles_Level.csv --> levels/compiled/level1.lvl
+    name = os.path.basename(os.path.dirname(level_data['terrain']))
+    return os.path.join(compiled_path,name+'.lvl')
+
+def build_arrays(level_data,names,workers):
+    #Parses the csv layers and works out the tile metadata, spread over worker processes if there is more than one
+    #Only numpy arrays come back from the workers, surfaces are made later on the main process
+    paths = [os.path.join(tiles_path,name) for name in names]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if threading.current_thread() is not threading.main_thread():
+        #The game compiles from the LevelLoader thread, starting processes from there can hang on some systems
+        #so only python level_compiler.py (on the main thread) ever uses the pool
+        workers = 1
+
+    if workers <= 1:
+        layers = [read_csv_layer(level_data[key]) for key in level_data]
+        metadata = [tile_metadata(path,name) for path,name in zip(paths,names)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            layer_jobs = [pool.submit(read_csv_layer,level_data[key]) for key in level_data]
+            metadata = list(pool.map(tile_metadata,paths,names,chunksize=max(1,len(names)//(workers*4))))
+            layers = [job.result() for job in layer_jobs]
+
+    #merged in the same order as the serial build so the file comes out the same
+    arrays = {}
+    for key,layer in zip(level_data,layers):
+        arrays['layer/'+key] = layer
+
+    arrays['tiles/height'] = numpy.array([data[0] for data in metadata],dtype=numpy.int32).reshape(len(names),terrain_tile_size)
+    arrays['tiles/width'] = numpy.array([data[1] for data in metadata],dtype=numpy.int32).reshape(len(names),terrain_tile_size)
+    arrays['tiles/angle'] = numpy.array([data[2] for data in metadata],dtype=numpy.int32).reshape(len(names),terrain_tile_size)
+    arrays['tiles/solid'] = numpy.array([data[3] for data in metadata],dtype=numpy.uint8)
+    arrays['tiles/mask'] = numpy.array([data[4] for data in metadata],dtype=numpy.uint8).reshape(len(names),terrain_tile_size*terrain_tile_size//8)
+    return arrays
+
+def compile_level(level_data,path=None,digest=None,workers=level_build['workers']):
+    path = path or artifact_path(level_data)
+    digest = digest or content_hash(level_data)
+
+    names = import_file_names(tiles_path)
+    arrays = build_arrays(level_data,names,workers)
+
+    write_artifact(path,digest,names,arrays)
+    return path
+
+def write_artifact(path,digest,names,arrays):
+    index = {}
+    offset = 0
+    for name,array in arrays.items():
+        index[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+
+    header = json.dumps({'version': FORMAT_VERSION, 'hash': digest, 'tile_names': names, 'arrays': index}).encode()
+    data_start = -(-(len(MAGIC) + 6 + len(header)) // ALIGN) * ALIGN
+
+    os.makedirs(os.path.dirname(path),exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path,'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<HI',FORMAT_VERSION,len(header)))
+        f.write(header)
+        for name,array in arrays.items():
+            f.seek(data_start + index[name]['offset'])
+            f.write(numpy.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path,path) #never leave a half written artifact behind
+
+def read_header(path):
+    #Returns the header and where the array data starts, or None if the file is missing or from another version
+    try:
+        with open(path,'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            version,header_size = struct.unpack('<HI',f.read(6))
+            if version != FORMAT_VERSION:
+                return None
+            header = json.loads(f.read(header_size))
+    except (OSError,ValueError,struct.error):
+        return None
+
+    data_start = -(-(len(MAGIC) + 6 + header_size) // ALIGN) * ALIGN
+    return header,data_start
+
+class CompiledLevel:
+    def __init__(self,path):
+        self.path = path
+        self.header,data_start = read_header(path)
+        self.tile_names = self.header['tile_names']
+
+        #One read only memory map for the whole file, every array is a view into it
+        self.raw = numpy.memmap(path,dtype=numpy.uint8,mode='r')
+        self.arrays = {}
+        for name,entry in self.header['arrays'].items():
+            dtype = numpy.dtype(entry['dtype'])
+            count = int(numpy.prod(entry['shape']))
+            start = data_start + entry['offset']
+            self.arrays[name] = self.raw[start:start + count*dtype.itemsize].view(dtype).reshape(entry['shape'])
+
+    def layer(self,key):
+        return self.arrays['layer/'+key]
+
+    def tile_heights(self):
+        return self.arrays['tiles/height'].tolist()
+
+    def tile_widths(self):
+        return self.arrays['tiles/width'].tolist()
+
+    def tile_angles(self):
+        return self.arrays['tiles/angle'].tolist()
+
+    def tile_masks(self):
+        #Unpacks the mask bits of each tile type into a pygame mask
+        masks = []
+        for bits in self.arrays['tiles/mask']:
+            alpha = numpy.unpackbits(bits).reshape(terrain_tile_size,terrain_tile_size).T * 255
+            surface = pygame.Surface((terrain_tile_size,terrain_tile_size),pygame.SRCALPHA)
+            pygame.surfarray.pixels_alpha(surface)[:] = alpha
+            masks.append(pygame.mask.from_surface(surface))
+        return masks
+
+def load_compiled_level(level_data):
+    #Opens the compiled level, rebuilding it first if it is missing or out of date
+    path = artifact_path(level_data)
+    digest = content_hash(level_data)
+
+    header = read_header(path)
+    if header is None or header[0]['hash'] != digest:
+        compile_level(level_data,path,digest)
+
+    return CompiledLevel(path)
+
+def benchmark(level_data,repeats=3):
+    #Times the serial build against the parallel one, best of a few runs each
+    path = artifact_path(level_data) + '.bench'
+    digest = content_hash(level_data)
+    results = {}
+    for label,workers in (('serial',1),('parallel',None)):
+        times = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            compile_level(level_data,path,digest,workers)
+            times.append(time.perf_counter() - start)
+        results[label] = min(times)
+    os.remove(path)
+    return results
+
+if __name__ == '__main__':
+    #python level_compiler.py --> rebuilds the compiled files of the levels in game_data
+    #python level_compiler.py --benchmark --> compares the serial and parallel build times
+    import sys
+    from game_data import level
+    if '--benchmark' in sys.argv:
+        results = benchmark(level)
+        print('cores', os.cpu_count())
+        for label,seconds in results.items():
+            print(label, round(seconds*1000,1), 'ms')
+        print('speed up', round(results['serial'] / results['parallel'],2))
+    else:
+        print('compiled', compile_level(level))
@@ -0,0 +1,83 @@
+import threading
+
+from utilities import tile_size
+from cache import import_graphics, import_cut_graphics, load_image
+from game_data import tile_angles, sprite_transforms
+from transform_cache import transform_cache
+from startup import profiler
+
+#Graphics the level tiles and entities are made from, decoded into the asset cache before the level is built
+level_assets = [
+    (import_graphics,('levels/level_data/tiles',)),
+    (import_cut_graphics,('levels/level_data/tiles/13grass04.png',tile_size)),
+    (import_graphics,('levels/level_data/deco/grass_deco',)),
+    (import_graphics,('levels/level_data/deco/assets',)),
+    (import_graphics,('levels/level_data/deco/palmtrees/images',)),
+    (import_graphics,('levels/level_data/deco/palmtrees/animated/palmtree1',)),
+    (import_graphics,('levels/level_data/deco/palmtrees/animated/palmtree4',)),
+    (import_graphics,('levels/level_data/rings/ring',)),
+    (load_image,('springs/spring1.png',)),
+    (load_image,('chao/w_chao01.png',)),
+    (load_image,('goalpost/goalpost1.png',)),
+    (load_image,('enemies/idle/left_stand1.png',)),
+]
+
+#Builds the level on a background thread so the story and loading screens keep running meanwhile
+#The main thread polls progress and picks up the finished level with result()
+class LevelLoader:
+    def __init__(self,game,level_data,surface):
+        self.game = game
+        self.level_data = level_data
+        self.surface = surface
+
+        self.steps = len(level_assets) + 1 #every prefetched asset, then the level itself
+        if sprite_transforms['prewarm']:
+            self.steps += 1
+        self.steps_done = 0
+        self.stage = 'waiting'
+        self.level = None
+        self.error = None
+
+        self.thread = threading.Thread(target=self.work,daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def work(self):
+        try:
+            self.stage = 'graphics'
+            for loader,args in level_assets:
+                loader(*args)
+                self.steps_done += 1
+
+            if sprite_transforms['prewarm']:
+                #every player frame at every slope angle in the level
+                self.stage = 'transforms'
+                frames = [image for key in self.game.assets.keys() if key.startswith('player/') for image in self.game.assets[key].images]
+                angles = {angle for angle_array in tile_angles.values() for angle in angle_array}
+                transform_cache.prewarm(frames,angles)
+                self.steps_done += 1
+
+            self.stage = 'level'
+            from level import Level #imported here so numpy and the level compiler are not loaded before the menu
+            with profiler.time('level','Level'):
+                self.level = Level(self.game,self.level_data,self.surface)
+            self.steps_done += 1
+            self.stage = 'done'
+        except Exception as error:
+            self.error = error #raised again on the main thread by result()
+            self.stage = 'failed'
+
+    def progress(self):
+        #Fraction of the work done, between 0 and 1
+        return self.steps_done / self.steps
+
+    def done(self):
+        return self.thread.ident is not None and not self.thread.is_alive()
+
+    def result(self):
+        #Waits for the work to finish and returns the built level
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.level
@@ -1,67 +1,29 @@
 import pygame
 import sys
-import numpy
 import math
 import random
-from PIL import Image
 
-from os import path
 from camera import CameraGroup
 from player import Player
-from level import Level
-from game_data import level
+from loader import LevelLoader
+from game_data import level, presentation, sound_bank, timestep
 from collisions import Collision
 from display import Display
 from music import Music
-from support import load_image, load_images, import_graphics
+from asset_manifest import AssetManifest, game_assets
 from utilities import *
 from clouds import Clouds
+from parallax import Parallax, TiledLayer, ObjectLayer
+from dirty_screen import DirtyScreen
+from transform_cache import transformed
+from text import render
+from presenter import Presenter
+from sources import LiveInput, SimClock
+from timestep import FixedTimestep
+from startup import profiler
 
 #Constants
 highscores = "scores.txt"
-_circle_cache = {}
-
-#This function fficiently generates a list of integer coordinates representing points on the circumference
-#of a circle with radius r using Bresenham's Circle Drawing Algorithm to optimize the calculation process
-def _circlepoints(r):
-    r = int(round(r))
-    if r in _circle_cache:
-        return _circle_cache[r]
-    x, y, e = r, 0, 1 - r
-    _circle_cache[r] = points = []
-    while x >= y:
-        points.append((x, y))
-        y += 1
-        if e < 0:
-            e += 2 * y - 1
-        else:
-            x -= 1
-            e += 2 * (y - x) - 1
-    points += [(y, x) for x, y in points if x > y]
-    points += [(-x, y) for x, y in points if x]
-    points += [(x, -y) for x, y in points if y]
-    points.sort()
-    return points
-
-#Creates 2 surfaces - normal text, and text to be outlined
-# then using symmetry to centre the text on top of the outline by calling the circlepoints_ function
-def render(text, font, gfcolor=pygame.Color('white'), ocolor=(0, 0, 0), opx=2):
-    textsurface = font.render(text, True, gfcolor).convert_alpha()
-    w = textsurface.get_width() + 2 * opx
-    h = font.get_height()
-
-    osurf = pygame.Surface((w, h + 2 * opx)).convert_alpha()
-    osurf.fill((0, 0, 0, 0))
-
-    surf = osurf.copy()
-
-    osurf.blit(font.render(text, True, ocolor).convert_alpha(), (0, 0))
-
-    for dx, dy in _circlepoints(opx):
-        surf.blit(osurf, (dx + opx, dy + opx))
-
-    surf.blit(textsurface, (opx, opx))
-    return surf
 
 #Creates a parallelogram that starts from the left, extending to the right
 def parallelogram_r(x, y, width, height, color,screen):
@@ -86,16 +48,16 @@ class Story:
 
         #Sonic and Tails image sprites for the story
         self.sonic = {
-            'normal': load_image("sprites/sonic/normal.png"),
-            'determined': load_image("sprites/sonic/determined.png"),
-            'resting':load_image("sprites/sonic/resting.png"),
-            'dunno':load_image("sprites/sonic/dunno.png")
+            'normal': game.assets['story/sonic/normal'],
+            'determined': game.assets['story/sonic/determined'],
+            'resting': game.assets['story/sonic/resting'],
+            'dunno': game.assets['story/sonic/dunno']
         }
 
         self.tails = {
-            'normal': load_image("sprites/tails/normal.png"),
-            'determined': load_image("sprites/tails/determined.png"),
-            'dunno': load_image("sprites/tails/dunno.png"),
+            'normal': game.assets['story/tails/normal'],
+            'determined': game.assets['story/tails/determined'],
+            'dunno': game.assets['story/tails/dunno'],
         }
 
         #Music and sound effect for the story
@@ -109,6 +71,8 @@ class Story:
             "tails_sonic": "audio/sonic-tails.mp3",
             "S3K_waves": "audio/S3K_waves.wav"
         }
+        if sound_bank['preload']: #voice clips are ready before the first line instead of decoding mid-dialogue
+            self.music.bank.load(self.assets.values())
 
         #initialising characters and settings
         self.character_s = self.sonic['normal']
@@ -251,95 +215,26 @@ class Story:
             return True
             
 
-#initialising
-pygame.init()
 class Game:
-    def __init__(self):
+    def __init__(self,input_source=None,game_clock=None,headless=False):
         #General initialising of core management of game
+        with profiler.time('game','pygame.init'):
+            pygame.init()
         self.game_screen = pygame.Surface((550,380))
         self.screen = pygame.display.set_mode((720,500))
+        self.presenter = Presenter(self,presentation['mode'],presentation['auto order'],presentation['budget ms'],presentation['trial frames'])
 
         self.clock = pygame.time.Clock()
 
-        #All assets the game will use; music, visuals, animation
-        self.assets = {
-            'player': load_image('sonic/idle/idle1.png'),
-            'player/start': Animation(load_images('sonic/start_run'),img_duration=12,loop=False),
-            'player/idle': Animation(load_images('sonic/idle'),img_duration=16),
-            'player/walk': Animation(load_images('sonic/walk'),img_duration=6),
-            'player/jog': Animation(load_images('sonic/jog'),img_duration=6),
-            'player/fastjog': Animation(load_images('sonic/fastjog'),img_duration=7),
-            'player/run': Animation(load_images('sonic/run'),img_duration=6),
-            'player/topspeed': Animation(load_images('sonic/toprun'),img_duration=6),
-            'player/jump': Animation(load_images('sonic/jump'),img_duration=6),
-            'player/springjump': Animation(load_images('sonic/springjump'),img_duration=6),
-            'player/lookup': Animation(load_images('sonic/look_up'),img_duration=5,loop=False),
-            'player/bored': Animation(load_images('sonic/bored'),img_duration=12,loop=False),
-            'player/bored1': Animation(load_images('sonic/bored2'),img_duration=10,loop=False),
-            'player/crouch': Animation(load_images('sonic/crouch'),img_duration=6,loop=False), 
-            'player/hurt': Animation(load_images('sonic/hurt'),img_duration=4,loop=False), 
-            'player/rolling': Animation(load_images('sonic/jump'),img_duration=6),   
-            'player/spindash': Animation(load_images('sonic/spindash'),img_duration=4),
-            'player/die': Animation(load_images('sonic/die'),img_duration=8,loop=False),
-            'spring/recoil': Animation(load_images('springs'),img_duration=5,loop=False),
-            'chao/idle': Animation(load_images('chao'),img_duration=14,loop=True),
-            'chao/walk': Animation(load_images('chao'),img_duration=14,loop=True),
-            'enemy/idle': Animation(load_images('enemies/idle'),img_duration=6,loop=True),
-            'enemy/walk':Animation(load_images('enemies/walk'),img_duration=6,loop=True),
-            'ring/idle': Animation(import_graphics('levels/level_data/rings/ring'),img_duration=5,loop=True),
-            'goalpost/idle': load_image('goalpost/goalpost1.png'),
-            'goalpost/finish': load_image('goalpost/goalpost7.png'),
-            'goalpost/spin': load_images('goalpost'),
-            'projectile': load_image('enemies/shoot.png'),
-            'clouds': load_image('cloud.png'),
-            'sound_effect/spring':"audio/sonic-spring.mp3",
-            'sound_effect/rings':"audio/sonic_ring_sound_effect.mp3",
-            'sound_effect/sonic_letsdothis': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_letsdoit.wav",
-            'sound_effect/sonic_herewego': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_herewego.wav",
-            'sound_effect/sonic_isthatit': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_isthatit.wav",
-            'sound_effect/sonic_ok': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_ok.wav",
-            'sound_effect/sonic_yeah': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yeah.wav",
-            'sound_effect/sonic_yes': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yes.wav",
-            'sound_effect/sonic_yes2': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_yes2.wav",
-            'sound_effect/sonic_cool': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_cool.wav",
-            'sound_effect/sonic_woofeelingood':"audio/woo-feelin-good-sonic-unleashed.mp3",
-            'sound_effect/jump': "audio/jump.mp3",
-            'sound_effect/spindash': "audio/sonic-spindash.mp3",
-            'sound_effect/sonic_ow': "audio/sonic_rush/Sonic Rush Voice Overs/sonic_ow.wav",
-            'sound_effect/homingdash': "audio/sonic_homingattack.mp3",
-            'sound_effect/loserings': "audio/S3K_loserings.wav",
-            'sound_effect/spindashfinish': "audio/S3K_spindashfinish.wav",
-            'sound_effect/sonic_tooeasy': "audio/sonic_tooeasy.mp3",
-            'sound_effect/enemy_kill': "audio/enemy_kill.wav",
-            'sound_effect/extra_life': "audio/sonic-extra-life.mp3",
-            'sound_effect/level_finish':"audio/sonic-level-finish.mp3",
-            'sound_effect/sonic_die': "audio/sonic-death-sound-effect.mp3",
-            'sound_effect/gameover': "audio/level_gameover.mp3",
-            'sound_effect/announcer_3': "audio/Anouncer3.wav",
-            'sound_effect/announcer_2': "audio/Anouncer2.wav",
-            'sound_effect/announcer_1': "audio/Anouncer1.wav",
-            'sound_effect/announcer_go': "audio/AnouncerGo!.wav",
-            'sound_effect/signpost': "audio/sonic-1-goal-post.mp3",
-            "beach1" : "audio/05. Neo Green Hill Zone - Act 1.mp3",
-            "beach2": "audio/06. Neo Green Hill Zone - Act 2.mp3",
-            'background/bg':load_image('neo_green_hill_zone_background.jpg'),
-            'background/asset': load_image('Leaf Forest Asset.png'),
-            'menu/button': load_image('menu_ui/button.png'),
-            'menu/button2': load_image('menu_ui/button2.png'),
-            'menu/music': "audio/A New Day.mp3",
-            'menu/bg': load_image("menu_ui/bg-leaf-storm.png"),
-            'menu/bg-score': load_image("menu_ui/score-bg.png"),
-            'menu/title': load_image("menu_ui/title.png"),
-            'menu/sonic': load_image("sonic-model.png"),
-            'menu/scoreboard_music': "audio/scoreboard.mp3",
-            'wasd': load_image("wasd.png"),
-            'op': load_image("op.png"),
-            'so': load_image("so.png"),
-            'o': load_image("o.png"),
-            'particle/leaf': Animation(load_images("leaf")),
-            'emerald beach': load_image("e6710a5ee862197627a7acb1145d6908.jpg")
+        #Where the level reads keys and time from, headless.py passes in scripted ones (see sources.py)
+        self.input = input_source or LiveInput()
+        self.game_clock = game_clock or SimClock() #game time only moves on when the level steps
+        self.timestep = FixedTimestep(timestep['tick rate'],timestep['max steps'])
+        self.headless = headless #no drawing and no saving scores
 
-        }
+        #All assets the game will use; music, visuals, animation (listed in asset_manifest.py)
+        #Only decoded when first used or prefetched by a screen
+        self.assets = AssetManifest(game_assets)
         
         self.sonic_sounds = [
                         self.assets['sound_effect/sonic_ok'],
@@ -356,29 +251,23 @@ class Game:
         self.substep_val = 6
         self.movement = [False,False]
 
-        self.music = Music()
-
-        self.bg = self.assets["background/bg"]
-        # [0.25,[120+i*200,10,70,400]] for i in range(1, num_repeats)
-        #Where [val, [x,y,w,h], object image.png/jpeg 
-        # [x,y,w,h] --> x pos, y pos, width of rec, height of rect
-        # first val , eg 0.25 - multiplier to make it move faster or slower
-        self.background_objects = [
-            [0.5,[50,350,400,800],self.assets['background/asset']],
-            [0.5,[450,350,400,800],self.assets['background/asset']],
-            [0.5,[850,350,400,800],self.assets['background/asset']],
-            [0.25,[1000,450,400,800],self.assets['background/asset']],
-            [0.25,[300,350,1200,1600],self.assets['background/asset']],
-            [0.5,[4050,250,400,800],self.assets['background/asset']],
-            [0.25,[4550,250,400,800],self.assets['background/asset']],
-            ]
+        with profiler.time('game','Music'):
+            self.music = Music()
+        if sound_bank['preload']: #the effects get decoded here, not the first time they play
+            with profiler.time('game','sound effect preload'):
+                self.music.bank.load([self.assets[name] for name in self.assets.keys() if name.startswith('sound_effect/')])
+
+        self.background_layers = None #made when the first level loads, the menus do not need the bg images
         
-        self.level_map = Level(self,level,self.game_screen)
+        #The level is only built once Adventure is clicked, on a background thread (see start_loading)
+        self.level_map = None
+        self.level_loader = None
         #self.load_level()
         
         #Score, time, lives
         self.lives = 3
-        self.display = Display(self)
+        with profiler.time('game','Display'):
+            self.display = Display(self)
         self.countdown = 3000
         self.highscores = []
 
@@ -387,35 +276,47 @@ class Game:
         self.rect1 = self.gameover_black.get_rect(center=(self.game_screen.get_width() // 2, 0))
     
     def loading(self,state):
-        #Imitation of loading a level
+        #Shows the loading screen for 5 seconds or until a key is pressed
+        #The controls screen also stays up until the level being built in the background is ready
         start_time = pygame.time.get_ticks()
+        skipped = False
         finish = False
+        dirty_screen = DirtyScreen(self.screen) #only the progress bar gets redrawn as the level loads
+        progress_rect = pygame.Rect(300,380,300,20)
+        last_progress = None
+        loading_text = render("LOADING...!",self.display.display_font_large,gfcolor=pygame.Color("white"))
+        title_text = render("[EMERALD BEACH]",self.display.display_font_large,gfcolor=pygame.Color("white"))
         
         self.music.stop()
 
         while not finish:
-            self.screen.fill((235,208,6))
-            #parallelogram_l(x,y,w,h) left to right
-            #parallelogram_r(x,y,w,h) right to left
-            #Generates a UI
+            #Progress bar of the background level build
+            progress = self.level_loader.progress() if self.level_loader else 1
 
-            parallelogram_l(400,200,150,400,pygame.Color(104,202,161),self.screen)
-            parallelogram_l(150,150,100,700,pygame.Color(222,132,2),self.screen)
-            parallelogram_l(250,300,220,600,pygame.Color(227,65,50),self.screen)
-            parallelogram_l(100,0,100,650,pygame.Color(62,85,163),self.screen)
+            def draw():
+                self.screen.fill((235,208,6))
+                #parallelogram_l(x,y,w,h) left to right
+                #parallelogram_r(x,y,w,h) right to left
+                #Generates a UI
 
-            self.screen.blit(render("LOADING...!",self.display.display_font_large,gfcolor=pygame.Color("white")),(300,300))
-            
-            if state == "story":
-                self.screen.blit(render("[EMERALD BEACH]",self.display.display_font_large,gfcolor=pygame.Color("white")),(100,240))
-            elif state == "wasd":
-                self.screen.blit(self.assets['wasd'],(250,200))
-                self.screen.blit(self.assets['o'],(450,200))
+                parallelogram_l(400,200,150,400,pygame.Color(104,202,161),self.screen)
+                parallelogram_l(150,150,100,700,pygame.Color(222,132,2),self.screen)
+                parallelogram_l(250,300,220,600,pygame.Color(227,65,50),self.screen)
+                parallelogram_l(100,0,100,650,pygame.Color(62,85,163),self.screen)
 
-            time = pygame.time.get_ticks()
-            if time - start_time > 5000:
-                #Waits 5 seconds before continuing
-                finish = True
+                self.screen.blit(loading_text,(300,300))
+                
+                if state == "story":
+                    self.screen.blit(title_text,(100,240))
+                elif state == "wasd":
+                    self.screen.blit(self.assets['wasd'],(250,200))
+                    self.screen.blit(self.assets['o'],(450,200))
+
+                pygame.draw.rect(self.screen,pygame.Color("white"),progress_rect,2)
+                pygame.draw.rect(self.screen,pygame.Color("white"),(progress_rect.x,progress_rect.y,progress_rect.width*progress,progress_rect.height))
+
+            dirty_screen.present(draw,[progress_rect] if progress != last_progress else [])
+            last_progress = progress
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -425,27 +326,47 @@ class Game:
                     if event.key == pygame.K_ESCAPE:
                         pygame.quit()
                         sys.exit()
+                    skipped = True
+
+            time = pygame.time.get_ticks()
+            level_ready = state != "wasd" or self.level_loader is None or self.level_loader.done()
+            if (skipped or time - start_time > 5000) and level_ready:
+                #Waits 5 seconds before continuing
+                finish = True
 
-            pygame.display.update()
             self.clock.tick(60)
 
+    def start_loading(self):
+        #Starts building the level in the background, only needed the first time Adventure is clicked
+        if self.level_map is None and self.level_loader is None:
+            self.level_loader = LevelLoader(self,level,self.game_screen)
+            self.level_loader.start()
+
+    def finish_loading(self):
+        #Picks up the level built in the background
+        if self.level_loader is not None:
+            self.level_map = self.level_loader.result()
+            self.level_loader = None
+
     def main_menu(self):
         click = False
         particles = []
+        dirty_screen = DirtyScreen(self.screen) #only the leaves and hovered buttons get redrawn each frame
+        last_buttons = None
+
+        #Text that never changes is rendered once
+        labels = {
+            'title': render("MAINMENU",self.display.display_font_large,gfcolor=pygame.Color("white")),
+            'adventure': render("ADVENTURE",self.display.display_font_black,gfcolor=pygame.Color("yellow")),
+            'scoreboard': render("SCOREBOARD",self.display.display_font_black,gfcolor=pygame.Color("yellow")),
+            'quit': render("QUIT",self.display.display_font_black,gfcolor=pygame.Color("yellow")),
+        }
     
         self.music.play_music(self.assets['menu/music'])
+        #Decoded while the menu is up, the story, loading screen and scoreboard are the next screens
+        self.assets.prefetch(['story/','emerald beach','wasd','o','menu/bg-score','menu/sonic'])
 
         while True:
-            #Generating UI
-            self.screen.blit(self.assets['menu/bg'],(0,0))
-            parallelogram_r(20,20,330,60,pygame.Color("deeppink"),self.screen)
-            parallelogram_r(20,20,300,60,pygame.Color("yellow"),self.screen)
-            parallelogram_r(20,20,240,60,pygame.Color("dodgerblue"),self.screen)
-            pygame.draw.line(self.screen,pygame.Color("white"),(0,90),(self.screen.get_width(),90),4)
-            self.screen.blit(render("MAINMENU",self.display.display_font_large,gfcolor=pygame.Color("white")),(20,20))
-
-            self.screen.blit(self.assets['menu/title'],(400,10))
-
             #Leaf particle effect (GUI)
             if random.random()*5000000 < self.screen.get_width()*self.screen.get_height():
                 pos = (random.random() * self.screen.get_width(), 0)
@@ -453,9 +374,8 @@ class Game:
 
             for particle in particles.copy():
                 kill = particle.update()
-                particle.render(self.screen,offset=(0,0))
-                if kill:
-                    particle.remove(particle)
+                if kill or particle.off_screen(self.screen):
+                    particles.remove(particle) #leaves that have fallen off the screen are not drawn or redrawn any more
 
             mx,my = pygame.mouse.get_pos()
 
@@ -471,17 +391,21 @@ class Game:
             if adventure_rect.collidepoint((mx,my)):
                 if click:
                     self.music.play_sound_effect(self.assets['sound_effect/sonic_letsdothis'])
+                    self.start_loading() #the level is built while the story is playing
                     self.loading("story")
                     self.story()
                     self.loading("wasd")
+                    self.finish_loading()
                     self.lives = 3 #resets lives count everytime level is accessed from main menu
                     self.load_level()
                     self.run()
+                    dirty_screen.invalidate()
                 else:
                     adventure = self.assets['menu/button2']
             if scoreboard_rect.collidepoint((mx,my)):
                 if click:
                     self.leaderboard()
+                    dirty_screen.invalidate()
                 else:
                     scoreboard = self.assets['menu/button2']
             if quit_rect.collidepoint((mx,my)):
@@ -491,12 +415,42 @@ class Game:
                 else:
                     quit = self.assets['menu/button2']
 
-            self.screen.blit(adventure,(50,200))
-            self.screen.blit(scoreboard,(50,300))
-            self.screen.blit(quit,(50,400))
-            self.screen.blit(render("ADVENTURE",self.display.display_font_black,gfcolor=pygame.Color("yellow")),(100,190))
-            self.screen.blit(render("SCOREBOARD",self.display.display_font_black,gfcolor=pygame.Color("yellow")),(100,290))
-            self.screen.blit(render("QUIT",self.display.display_font_black,gfcolor=pygame.Color("yellow")),(140,390))
+            def background():
+                #Generating UI, the parts under the leaves never change
+                self.screen.blit(self.assets['menu/bg'],(0,0))
+                parallelogram_r(20,20,330,60,pygame.Color("deeppink"),self.screen)
+                parallelogram_r(20,20,300,60,pygame.Color("yellow"),self.screen)
+                parallelogram_r(20,20,240,60,pygame.Color("dodgerblue"),self.screen)
+                pygame.draw.line(self.screen,pygame.Color("white"),(0,90),(self.screen.get_width(),90),4)
+                self.screen.blit(labels['title'],(20,20))
+
+                self.screen.blit(self.assets['menu/title'],(400,10))
+
+            def draw():
+                for particle in particles:
+                    particle.render(self.screen,offset=(0,0))
+
+            #Drawn over the leaves
+            overlay = [
+                (adventure,(50,200)),
+                (scoreboard,(50,300)),
+                (quit,(50,400)),
+                (labels['adventure'],(100,190)),
+                (labels['scoreboard'],(100,290)),
+                (labels['quit'],(140,390)),
+            ]
+
+            #Areas that changed: every leaf, and a button when it is hovered/unhovered
+            changed = [particle.rect() for particle in particles]
+            buttons = [(adventure,(50,200)),(scoreboard,(50,300)),(quit,(50,400))]
+            if last_buttons:
+                for (image,pos),(last_image,last_pos) in zip(buttons,last_buttons):
+                    if image is not last_image:
+                        changed.append(image.get_rect(topleft=pos).union(last_image.get_rect(topleft=pos)))
+            last_buttons = buttons
+            dirty_screen.present(draw,changed,background,overlay)
+            if profiler.menu_ready(): #the startup report stops once the first frame is up
+                return
             
             click = False
             for event in pygame.event.get():
@@ -515,26 +469,30 @@ class Game:
                     if event.button == 3:
                         click = True
             
-            pygame.display.update()
             self.clock.tick(60)
     
     def leaderboard(self):
         running = True
         particles = []
+        dirty_screen = DirtyScreen(self.screen) #only the leaves and the back button get redrawn each frame
+        last_menu = None
         self.music.play_music(self.assets['menu/scoreboard_music'])
 
         #Loads any saved scores before the leaderboard.
         self.load_score()
 
-        while running:
-            #creates UI
-            self.screen.blit(self.assets['menu/bg-score'],(0,0))
-            parallelogram_r(20,20,330,60,pygame.Color("deeppink"),self.screen)
-            parallelogram_r(20,20,300,60,pygame.Color("yellow"),self.screen)
-            parallelogram_r(20,20,240,60,pygame.Color("dodgerblue"),self.screen)
-            pygame.draw.line(self.screen,pygame.Color("white"),(0,90),(self.screen.get_width(),90),4)
-            self.screen.blit(render("SCOREBOARD",self.display.display_font_large,gfcolor=pygame.Color("white")),(20,20))
+        #Text that never changes is rendered once
+        title = render("SCOREBOARD",self.display.display_font_large,gfcolor=pygame.Color("white"))
+        back = render("BACK",self.display.display_font_black,gfcolor=pygame.Color("white"))
+        score_texts = [render(f"{str(score)}",self.display.display_font_black,gfcolor=pygame.Color("white")) for score in self.highscores]
 
+        #The box behind each score, drawn once onto a surface with the black left see-through
+        score_box = pygame.Surface((251,31))
+        score_box.set_colorkey((0,0,0))
+        parallelogram_r(30,0,220,30,"deeppink",score_box)
+        parallelogram_r(30,0,190,30,"yellow",score_box)
+
+        while running:
             #Leaf particle effect (GUI) - creates leaves to fall from the top of the screen
             if random.random()*5000000 < self.screen.get_width()*self.screen.get_height():
                 pos = (random.random() * self.screen.get_width(), 0)
@@ -542,29 +500,14 @@ class Game:
 
             for particle in particles.copy():
                 kill = particle.update()
-                particle.render(self.screen,offset=(0,0))
-                if kill:
-                    particle.remove(particle)
-            
-            self.screen.blit(self.assets['menu/sonic'], (350,30))
+                if kill or particle.off_screen(self.screen):
+                    particles.remove(particle) #leaves that have fallen off the screen are not drawn or redrawn any more
 
             mx,my = pygame.mouse.get_pos() 
 
             menu = self.assets['menu/button']
             menu_rect = pygame.Rect(50,400,228,33)
 
-            x_pos,y_pos= 50,120
-            for score in self.highscores:
-                #rendering text onto screen from file "highscores.txt"
-                #does this 5 times as there are 5 scores in highscores 
-                score_text = render(f"{str(score)}",self.display.display_font_black,gfcolor=pygame.Color("white"))
-                score_rect = pygame.Rect(x_pos,y_pos,228,33)
-                parallelogram_r(x_pos,y_pos,220,30,"deeppink",self.screen)
-                parallelogram_r(x_pos,y_pos,190,30,"yellow",self.screen)
-                self.screen.blit(score_text,score_rect)
-
-                y_pos += 55
-
             #check collision with back button to go back to menu
             if menu_rect.collidepoint((mx,my)):
                 if click:
@@ -572,8 +515,38 @@ class Game:
                 else:
                     menu = self.assets['menu/button2']
 
-            self.screen.blit(menu,(50,400))
-            self.screen.blit(render("BACK",self.display.display_font_black,gfcolor=pygame.Color("white")),(140,390))
+            def background():
+                #creates UI, the parts under the leaves never change
+                self.screen.blit(self.assets['menu/bg-score'],(0,0))
+                parallelogram_r(20,20,330,60,pygame.Color("deeppink"),self.screen)
+                parallelogram_r(20,20,300,60,pygame.Color("yellow"),self.screen)
+                parallelogram_r(20,20,240,60,pygame.Color("dodgerblue"),self.screen)
+                pygame.draw.line(self.screen,pygame.Color("white"),(0,90),(self.screen.get_width(),90),4)
+                self.screen.blit(title,(20,20))
+
+            def draw():
+                for particle in particles:
+                    particle.render(self.screen,offset=(0,0))
+
+            #Drawn over the leaves
+            overlay = [(self.assets['menu/sonic'], (350,30))]
+            x_pos,y_pos= 50,120
+            for score_text in score_texts:
+                #rendering text onto screen from file "highscores.txt"
+                #does this 5 times as there are 5 scores in highscores 
+                overlay.append((score_box,(x_pos-30,y_pos)))
+                overlay.append((score_text,(x_pos,y_pos)))
+
+                y_pos += 55
+            overlay.append((menu,(50,400)))
+            overlay.append((back,(140,390)))
+
+            #Areas that changed: every leaf, and the back button when it is hovered/unhovered
+            changed = [particle.rect() for particle in particles]
+            if last_menu is not None and menu is not last_menu:
+                changed.append(menu.get_rect(topleft=(50,400)).union(last_menu.get_rect(topleft=(50,400))))
+            last_menu = menu
+            dirty_screen.present(draw,changed,background,overlay)
 
             click = False
             for event in pygame.event.get():
@@ -587,7 +560,6 @@ class Game:
                     if event.button == 1:
                         click = True
                 
-            pygame.display.update()
             self.clock.tick(60)
         
         self.music.play_music(self.assets['menu/music'])
@@ -643,10 +615,33 @@ class Game:
         self.player = Player((32,600),self)
         self.camera_group = CameraGroup(self.game_screen)
         
+        if self.background_layers is None:
+            self.bg = self.assets["background/bg"]
+            # [0.25,[120+i*200,10,70,400]] for i in range(1, num_repeats)
+            #Where [val, [x,y,w,h], object image.png/jpeg 
+            # [x,y,w,h] --> x pos, y pos, width of rec, height of rect
+            # first val , eg 0.25 - multiplier to make it move faster or slower
+            self.background_objects = [
+                [0.5,[50,350,400,800],self.assets['background/asset']],
+                [0.5,[450,350,400,800],self.assets['background/asset']],
+                [0.5,[850,350,400,800],self.assets['background/asset']],
+                [0.25,[1000,450,400,800],self.assets['background/asset']],
+                [0.25,[300,350,1200,1600],self.assets['background/asset']],
+                [0.5,[4050,250,400,800],self.assets['background/asset']],
+                [0.25,[4550,250,400,800],self.assets['background/asset']],
+                ]
+            #The bg image is made into one strip so it only takes one blit, it drifts the opposite way to the level
+            self.background_layers = [
+                TiledLayer(self.bg,-0.25,150,self.game_screen.get_width()),
+                ObjectLayer(self.background_objects),
+                ]
+
         self.clouds = Clouds(self.assets['clouds'], count=10)
+        self.parallax = Parallax(self.game_screen,self.background_layers + [self.clouds])
 
         self.camera_group.add(self.player)
-        self.last_frame_time = pygame.time.get_ticks()
+        self.level_map.stream(self.camera_group) #load the chunks around the start of the level
+        self.last_frame_time = self.game_clock.ticks()
         self.elapsed_time = 0
 
         self.level_start_x = 0
@@ -660,6 +655,8 @@ class Game:
         self.hurt_frames = 0
         self.dead_frames = 0
         self.end_frames = 0
+        self.start_time = self.last_frame_time #when the level timer started, set again until the countdown ends
+        self.score_texts = None #made by calc_score at the end of the level
 
         self.player.is_dead = False
 
@@ -671,14 +668,13 @@ class Game:
             sprite.finish = False
             sprite.spin = False
     
-    def gameover(self):
+    def slide_gameover(self):
         # the text starts at the top of the screen and keeps moving downwards until it reaches the middle of the screen
         if self.rect1.centery < self.game_screen.get_height() // 2:
-            self.game_screen.blit(self.gameover_black, (self.rect1[0],self.rect1[1]))
-
             self.rect1.centery += 1
-        else:
-            self.game_screen.blit(self.gameover_black, (self.rect1[0],self.rect1[1]))
+
+    def gameover(self):
+        self.game_screen.blit(self.gameover_black, (self.rect1[0],self.rect1[1]))
     
     def calc_score(self):
         # Depending on the time threshold <30 seconds gets 50k, 30<time<60 seconds gets 25k and >60 seconds gets 5k in score
@@ -702,27 +698,23 @@ class Game:
 
         return ring_bonus,rect1,time_bonus,rect2,total,rect3,score
 
-    def display_score(self,ring_bonus,rect1,time_bonus,rect2,total,rect3):
+    def slide_score(self,rect1,rect2,rect3):
         # the text starts at the left part of the screen and keeps moving right until it reaches the middle of the screen
-        finished = False
         if rect1.centerx < self.game_screen.get_width()//2:
-            self.game_screen.blit(ring_bonus,(rect1[0],rect1[1]))
-            self.game_screen.blit(time_bonus,(rect2[0],rect2[1]))
-            
             rect1.centerx += 4
             rect2.centerx += 4
-        else:
-            self.game_screen.blit(ring_bonus,(rect1[0],rect1[1]))
-            self.game_screen.blit(time_bonus,(rect2[0],rect2[1]))
-            finished = True
+
+        # Total comes in after the time and ring bonus
+        elif rect3.centerx < self.game_screen.get_width()//2:
+            rect3.centerx += 5
+
+    def display_score(self,ring_bonus,rect1,time_bonus,rect2,total,rect3):
+        self.game_screen.blit(ring_bonus,(rect1[0],rect1[1]))
+        self.game_screen.blit(time_bonus,(rect2[0],rect2[1]))
 
         # Total displayed after the time and ring bonus
-        if finished:
-            if rect3.centerx < self.game_screen.get_width()//2:
-                self.game_screen.blit(total,(rect3[0],rect3[1]))
-                rect3.centerx += 5
-            else:
-                self.game_screen.blit(total,(rect3[0],rect3[1]))
+        if rect1.centerx >= self.game_screen.get_width()//2:
+            self.game_screen.blit(total,(rect3[0],rect3[1]))
     
     def story(self):
         story = Story(self)
@@ -730,34 +722,48 @@ class Game:
         click = False
 
         self.music.play_music(self.assets['beach2'])
+        #Everything the level uses is decoded while the story is being read
+        self.assets.prefetch(['player','player/','spring/','chao/','enemy/','ring/','goalpost/','projectile','clouds','background/','op','so'])
+
+        #Nothing moves on the story screen, so it is only redrawn when the dialogue or characters change
+        dirty_screen = DirtyScreen(self.screen)
+        last_state = None
 
         # Starting label is Sonic
         name,color = "Sonic the Hegdehog", "skyblue"
         while running:
-            self.screen.blit(self.assets['emerald beach'],(0,0))
-
-            pygame.draw.line(self.screen,pygame.Color("white"),(0,330),(self.screen.get_width(),330),10)
-            pygame.draw.rect(self.screen,(0,0,0),story.dialoguebox)
             mx,my = pygame.mouse.get_pos() 
 
-            # The characters might pop up/disappear at different points of the story, hence why the need for sonic/tails_show
-            # Only blits the characters if their flag is triggered
-            if story.sonic_show:
-                self.screen.blit(story.character_s,(0,170))
-            if story.tails_show:
-                self.screen.blit(story.character_t, (500,170))
-                
-            story.label(name,color)
-
             if story.check_line():
                 story.sound_effect = True
 
-            if name == "Miles 'Tails' Prower":
-                #The dialogue is seperated by the first character of the line
-                #+ indicates Tails is speaking, so display characters after that character
-                story.set_text(story.set_text(story.lines[story.current_line][1:]))
-            else:
-                story.set_text(story.set_text(story.lines[story.current_line]))
+            def draw():
+                self.screen.blit(self.assets['emerald beach'],(0,0))
+
+                pygame.draw.line(self.screen,pygame.Color("white"),(0,330),(self.screen.get_width(),330),10)
+                pygame.draw.rect(self.screen,(0,0,0),story.dialoguebox)
+
+                # The characters might pop up/disappear at different points of the story, hence why the need for sonic/tails_show
+                # Only blits the characters if their flag is triggered
+                if story.sonic_show:
+                    self.screen.blit(story.character_s,(0,170))
+                if story.tails_show:
+                    self.screen.blit(story.character_t, (500,170))
+                    
+                story.label(name,color)
+
+                if name == "Miles 'Tails' Prower":
+                    #The dialogue is seperated by the first character of the line
+                    #+ indicates Tails is speaking, so display characters after that character
+                    story.set_text(story.set_text(story.lines[story.current_line][1:]))
+                else:
+                    story.set_text(story.set_text(story.lines[story.current_line]))
+
+            state = (story.current_line,name,story.character_s,story.character_t,story.sonic_show,story.tails_show)
+            if state != last_state:
+                dirty_screen.invalidate()
+            last_state = state
+            dirty_screen.present(draw,[])
 
             if story.dialoguebox.collidepoint((mx,my)):
                 if click:
@@ -779,374 +785,447 @@ class Game:
                     if event.button == 1:
                         click = True
 
-            pygame.display.update()
             self.clock.tick(60)
 
     def run(self):
+        #The level always steps 60 times a second of real time, drawing happens once a frame at whatever rate the display manages
+        #If a frame does no steps there is nothing new to draw unless it is being interpolated
         running = True
-        num_repeats = math.ceil((self.game_screen.get_width() / self.bg.get_width()) + 10) #to work out how many times the bg can fit in one screen before needing to be repeated
+        self.presenter.start()
+        self.timestep.start()
         while running:
-            game_over = False
-
-            #creates scrolling effect with the background
-            self.game_screen.fill((0, 152, 248))
-            for i in range(-num_repeats,num_repeats):
-                self.game_screen.blit(self.bg,(i*self.bg.get_width() + (self.camera_group.offset.x//4),150))
-
-            #Paradox scrolling, clouds and level tiles are updated to move along with the camera of the player
-            self.camera_group.parallax_scroll(self.background_objects)
-            self.clouds.update()
-            self.clouds.render(self.game_screen, offset=(self.camera_group.offset.x, self.camera_group.offset.y))
-            self.level_map.update(self.camera_group)
-
-            #Calculating in-game real time
-            current_time = pygame.time.get_ticks()
-            time_passed = current_time - self.last_frame_time
-            self.elapsed_time += time_passed
-            self.last_frame_time = current_time
-
-            if self.start_game: #if the level just starts, displays  3..2..1..go!
-                start_time = pygame.time.get_ticks()
-                if self.countdown == 3000:
-                    self.music.play_sound_effect(self.assets['sound_effect/sonic_letsdothis'])
-                    self.music.play_sound_effect(self.assets['sound_effect/announcer_3'])
-                if self.countdown == 2000:
-                    self.music.play_sound_effect(self.assets['sound_effect/announcer_2'])
-                if self.countdown == 1000:
-                    self.music.play_sound_effect(self.assets['sound_effect/announcer_1'])
-                
-                self.countdown -= time_passed
-
-                if self.countdown >= 0:
-                    # Blit the countdown text at the center of the screen
-                    self.text = self.game_screen.blit(render(f'{(self.countdown // 1000)+1}',self.display.display_font_black),(self.game_screen.get_width()//2,self.game_screen.get_height()//2))
-                elif self.countdown < 0: 
-                    self.text = self.game_screen.blit(render("GO!!!",self.display.display_font_orange,gfcolor=pygame.Color("orange")),(self.game_screen.get_width()//2,self.game_screen.get_height()//2))
-                    self.player.start = False
-                    if self.countdown < -800:
-                        self.text = self.game_screen.blit(render("GO!!!",self.display.display_font_orange,gfcolor=pygame.Color("orange")),(self.game_screen.get_width()//2,self.game_screen.get_height()//2))
-                        self.music.play_sound_effect(self.assets['sound_effect/sonic_herewego'])
-                        self.music.play_sound_effect(self.assets['sound_effect/announcer_go'])
-                        self.start_game = False
-                
-            #die animation of player
-            if self.player.is_dead:
-                self.player.fall = True
-                self.player.die()
-
-            # the frames following the player's death
-            if self.dead_frames>0:
-                self.dead_frames += 1
-                if self.dead_frames > 360 and self.lives != 0:
-                    self.display.seconds = 0 #resets time and entities if player can restart
-                    self.display.minutes = 0
-                    self.load_level()
-                elif self.lives == 0:
-                    if self.dead_frames == 160:
-                        game_over = True
-                    #stop game
-                    if self.dead_frames > 160:
-                        self.gameover()
-                    if self.dead_frames > 1080:
-                        running = False
-                
-            if game_over:
-                game_over = False
-                pygame.mixer.music.stop()
-                self.music.play_sound_effect(self.assets['sound_effect/gameover'])
-
-            #the frame after the player has reached the end of the level
-            if self.end_game:
-                self.end_frames += 1
-                if self.end_frames == 20:
-                    self.music.play_sound_effect(self.assets['sound_effect/signpost'])
-                if self.end_frames == 60:
-                    self.player.control_lock(15000) #freeze player input
-                if self.end_frames == 360:
-                    for sprite in self.level_map.goalpost_sprite:
-                        pygame.mixer.music.stop()
-                        self.music.play_sound_effect(self.assets['sound_effect/level_finish'])
-                        sprite.spin = False
-                        sprite.finish = True
-                        ring_bonus,rect1,time_bonus,rect2,total,rect3,score = self.calc_score()
-
-                #display scores, save and go back to the main menu
-                if self.end_frames > 360:
-                    self.display_score(ring_bonus,rect1,time_bonus,rect2,total,rect3)
-                if self.end_frames == 360:
-                    self.save_score(score)
-                if self.end_frames == 720:
-                    self.music.play_sound_effect(random.choice(self.sonic_sounds))
-                if self.end_frames == 1080:
-                    running = False #breaks out of the running loop so player can go back to the main menu
-
-            #Creates leaf particles that fall from the top of the screen at random positions 
-            if random.random()*5000000 < self.game_screen.get_width()*self.game_screen.get_height():
-                pos = (random.random() * self.game_screen.get_width(), 0)
-                self.particles.append(Particle(self,pos,velocity=[random.random(),random.random()],frame=random.randint(0,20)))
+            steps = self.timestep.advance()
+            for i in range(steps):
+                self.previous_positions = (pygame.math.Vector2(self.player.rect.topleft),self.camera_group.offset.copy())
+                running = self.step()
+                self.game_clock.tick()
+                if not running:
+                    break
+
+            if steps or timestep['interpolate']:
+                if timestep['interpolate']:
+                    self.draw_interpolated(self.timestep.alpha())
+                else:
+                    self.draw()
+                self.presenter.present()
+            self.clock.tick(timestep['display fps'])
+        
+        self.presenter.stop()
+        if not running:
+            self.loading("adventure")
+            self.music.play_music(self.assets['menu/music'])
 
-            for particle in self.particles.copy():
-                kill = particle.update()
-                particle.render(self.game_screen,offset=(0,0))
-                if kill:
-                    particle.remove(particle) #removes them after they cycled through their animation
-
-            # Checks and updates chao entities
-            for chao in self.level_map.chao_sprites:
-                chao_pos = (self.camera_group.offset.x,self.camera_group.offset.y)
-                chao.update(self.level_map,(0,0))
-                chao.render(self.game_screen,offset =chao_pos)
-
-                if self.chao_interact:
-                    if self.player.rect.x < 700:
-                        self.game_screen.blit(self.assets['op'],(256,230)) #displays tutorial prompt
-                    else:
-                        self.game_screen.blit(self.assets['so'],(400,150)) #displays tutorial prompt
-
-            # Checks and updates enemy entities
-            for enemy in self.level_map.enemy_sprites.copy():
-                enemy_pos = (self.camera_group.offset.x,self.camera_group.offset.y+16)
-                kill = enemy.update(self.level_map,(0,0))
-                enemy.render(self.game_screen,offset =enemy_pos)
-
-                # Checks for player-enemy collision
-                if self.player.rect.collidepoint((enemy.rect()[0],enemy.rect()[1])) and not self.player.is_dead:
-                    if not(self.player.is_jumping or self.player.is_rolling or self.player.is_homingdash) and not self.player.is_hurt:
-                        if self.player.ring_count != 0: #If player has rings, player gets hurt
-                            self.player.is_hurt = True
-
-                            self.hurt_time = pygame.time.get_ticks()
-                            self.player.hurt()
-                            self.hurt_frames += 1
-                            self.player.ring_count = 0
-                        
-                        elif self.player.ring_count == 0: #Else player loses a life and restarts the level/quits the game depending on life count
-                            self.player.speed_y = 0
-                            self.music.play_sound_effect(self.assets['sound_effect/sonic_die'])
-                            self.player.die_anim()
-                            self.player.is_dead = True
-                            self.lives -= 1
-                            self.dead_frames += 1
-                        
-                    if (self.player.is_jumping or self.player.is_homingdash):
-                        self.player.rebound() #Go back up into the air as if the player is bouncing off of the enemy
-
-                if kill: #Removes the enemy off of the screen
-                    self.player.score += 1000
-                    self.music.play_sound_effect(random.choice(self.sonic_sounds))
-                    self.music.play_sound_effect(self.assets['sound_effect/enemy_kill'])
-                    self.level_map.enemy_sprites.remove(enemy)
+    def step(self):
+        #Moves the game on by one frame without drawing anything, returns False once the level is over
+        #Input comes from self.input and time from self.game_clock, so it can be run headless (see headless.py)
+        running = True
+        game_over = False
+
+        #Paradox scrolling, clouds and level tiles are updated to move along with the camera of the player
+        self.parallax.update()
+        self.level_map.stream(self.camera_group)
+        self.level_map.animate(self.camera_group)
+
+        #Calculating in-game real time
+        current_time = self.game_clock.ticks()
+        time_passed = current_time - self.last_frame_time
+        self.elapsed_time += time_passed
+        self.last_frame_time = current_time
+
+        if self.start_game: #if the level just starts, plays 3..2..1..go!
+            self.start_time = self.game_clock.ticks()
+            if self.countdown == 3000:
+                self.music.play_sound_effect(self.assets['sound_effect/sonic_letsdothis'])
+                self.music.play_sound_effect(self.assets['sound_effect/announcer_3'])
+            if self.countdown == 2000:
+                self.music.play_sound_effect(self.assets['sound_effect/announcer_2'])
+            if self.countdown == 1000:
+                self.music.play_sound_effect(self.assets['sound_effect/announcer_1'])
             
-            #projectile array --> [[x,y],direction,timer]
-            for projectile in self.projectiles.copy():
-                projectile[0][0] += projectile[1]
-                projectile[2] += 1
-                img = self.assets['projectile']
-                self.game_screen.blit(img,(projectile[0][0] - img.get_width()/2 - self.camera_group.offset.x, projectile[0][1] - img.get_height()/2-self.camera_group.offset.y))
-                if projectile[2] > 240: #if exceeds the frame time they exist for, destroy the projectile and make them hit against the air
-                    for i in range(4):
-                        self.sparks.append(Spark(self.projectiles[0][0],random.random()- 0.5 + (math.pi if projectile[1] > 0 else 0), 2+random.random()))
-                    self.projectiles.remove(projectile)
-                elif not self.player.is_hurt and not self.player.is_dead:
-                    if self.player.rect.collidepoint(projectile[0]): #if player collides with the projectile 
-                        if self.player.ring_count != 0: # if player has rings, get hurt
-                            self.player.is_hurt = True
-
-                            self.hurt_time = pygame.time.get_ticks()
-                            self.player.hurt()
-                            self.hurt_frames += 1
-                            self.player.ring_count = 0
-                        
-                        elif self.player.ring_count == 0: # else lose a life from the player and restart level/quit back to main menu
-                            self.player.speed_y = 0
-                            self.player.die_anim()
-                            self.music.play_sound_effect(self.assets['sound_effect/sonic_die'])
-                            self.player.is_dead = True
-                            self.lives -= 1
-                            self.dead_frames += 1
-
-                        self.projectiles.remove(projectile)
-                        for i in range(30):
-                            angle = random.random() *math.pi *2
-                            self.sparks.append(Spark(self.player.rect.center,angle,2+random.random())) #player sparks blow up
+            self.countdown -= time_passed
+
+            if self.countdown < 0: 
+                self.player.start = False
+                if self.countdown < -800:
+                    self.music.play_sound_effect(self.assets['sound_effect/sonic_herewego'])
+                    self.music.play_sound_effect(self.assets['sound_effect/announcer_go'])
+                    self.start_game = False
             
-            for spark in self.sparks.copy(): #any sparks generated from enemy or projectile collision is destroyed after set frame period after being created
-                pos = (self.camera_group.offset.x, self.camera_group.offset.y)
-                kill = spark.update()
-                spark.render(self.game_screen,offset=pos)
-                if kill:
-                    self.sparks.remove(spark)
-
-            # Checks and updates ring entities
-            for ring in self.rings.copy():
-                pos = (self.camera_group.offset.x, self.camera_group.offset.y)
-                kill = ring.update(self.level_map) #remove the ring from the screen
-                ring.render(self.game_screen,offset=pos)
-                if kill:
-                    self.rings.remove(ring)
-
-            # Checks and updates goal post
-            for sprite in self.level_map.goalpost_sprite:
-                goalpost_pos = (sprite.rect.x - self.camera_group.offset.x, sprite.rect.y - self.camera_group.offset.y)
-                self.game_screen.blit(sprite.image, goalpost_pos)
-
-                #Check if player collides with the goal post signifying the end of the level
-                if self.player.rect.colliderect(sprite.rect):
-                    sprite.spin = True
-
-                sprite.animation()
+        #die animation of player
+        if self.player.is_dead:
+            self.player.fall = True
+            self.player.die()
+
+        # the frames following the player's death
+        if self.dead_frames>0:
+            self.dead_frames += 1
+            if self.dead_frames > 360 and self.lives != 0:
+                self.display.seconds = 0 #resets time and entities if player can restart
+                self.display.minutes = 0
+                self.load_level()
+            elif self.lives == 0:
+                if self.dead_frames == 160:
+                    game_over = True
+                if self.dead_frames > 160:
+                    self.slide_gameover()
+                #stop game
+                if self.dead_frames > 1080:
+                    running = False
             
-                if sprite.spin:
-                    self.end_game = True #Level completes
-                    self.end_frames += 1
-
-            #If player gets hurt, generate some sparks 
-            if self.hurt_frames>0:
-                for i in range(4):
-                    angle = random.random() *math.pi *2
-                    self.sparks.append(Spark(self.player.rect.center,angle,2+random.random()))
-                self.hurt_frames += 1
-            if self.hurt_frames == 120: #After 3 seconds, stop hurt aimation
+        if game_over:
+            game_over = False
+            pygame.mixer.music.stop()
+            self.music.play_sound_effect(self.assets['sound_effect/gameover'])
+
+        #the frame after the player has reached the end of the level
+        if self.end_game:
+            self.end_frames += 1
+            if self.end_frames == 20:
+                self.music.play_sound_effect(self.assets['sound_effect/signpost'])
+            if self.end_frames == 60:
+                self.player.control_lock(15000) #freeze player input
+            if self.end_frames == 360:
+                for sprite in self.level_map.goalpost_sprite:
+                    pygame.mixer.music.stop()
+                    self.music.play_sound_effect(self.assets['sound_effect/level_finish'])
+                    sprite.spin = False
+                    sprite.finish = True
+                    self.score_texts = self.calc_score()
+
+            #slide the scores in, save them and go back to the main menu (the scores are drawn in draw())
+            if self.end_frames > 360 and self.score_texts is not None:
+                self.slide_score(self.score_texts[1],self.score_texts[3],self.score_texts[5])
+            if self.end_frames == 360 and not self.headless: #headless runs never touch the real score file
+                self.save_score(self.score_texts[6])
+            if self.end_frames == 720:
+                self.music.play_sound_effect(random.choice(self.sonic_sounds))
+            if self.end_frames == 1080:
+                running = False #breaks out of the running loop so player can go back to the main menu
+
+        #Creates leaf particles that fall from the top of the screen at random positions 
+        if random.random()*5000000 < self.game_screen.get_width()*self.game_screen.get_height():
+            pos = (random.random() * self.game_screen.get_width(), 0)
+            self.particles.append(Particle(self,pos,velocity=[random.random(),random.random()],frame=random.randint(0,20)))
+
+        for particle in self.particles.copy():
+            kill = particle.update()
+            if kill:
+                particle.remove(particle) #removes them after they cycled through their animation
+
+        # Checks and updates chao entities
+        for chao in self.level_map.chao_sprites:
+            chao.update(self.level_map,(0,0))
+
+        # Checks and updates enemy entities
+        for enemy in self.level_map.enemy_sprites.copy():
+            kill = enemy.update(self.level_map,(0,0))
+
+            # Checks for player-enemy collision
+            if self.player.rect.collidepoint((enemy.rect()[0],enemy.rect()[1])) and not self.player.is_dead:
+                if not(self.player.is_jumping or self.player.is_rolling or self.player.is_homingdash) and not self.player.is_hurt:
+                    if self.player.ring_count != 0: #If player has rings, player gets hurt
+                        self.player.is_hurt = True
+
+                        self.hurt_time = self.game_clock.ticks()
+                        self.player.hurt()
+                        self.hurt_frames += 1
+                        self.player.ring_count = 0
+                    
+                    elif self.player.ring_count == 0: #Else player loses a life and restarts the level/quits the game depending on life count
+                        self.player.speed_y = 0
+                        self.music.play_sound_effect(self.assets['sound_effect/sonic_die'])
+                        self.player.die_anim()
+                        self.player.is_dead = True
+                        self.lives -= 1
+                        self.dead_frames += 1
+                    
+                if (self.player.is_jumping or self.player.is_homingdash):
+                    self.player.rebound() #Go back up into the air as if the player is bouncing off of the enemy
+
+            if kill: #Removes the enemy off of the screen
+                self.player.score += 1000
+                self.music.play_sound_effect(random.choice(self.sonic_sounds))
+                self.music.play_sound_effect(self.assets['sound_effect/enemy_kill'])
+                self.level_map.enemy_sprites.remove(enemy)
+        
+        #projectile array --> [[x,y],direction,timer]
+        for projectile in self.projectiles.copy():
+            projectile[0][0] += projectile[1]
+            projectile[2] += 1
+            if projectile[2] > 240: #if exceeds the frame time they exist for, destroy the projectile and make them hit against the air
                 for i in range(4):
-                    angle = random.random() *math.pi *2
-                    self.sparks.append(Spark(self.player.rect.center,angle,2+random.random()))
+                    self.sparks.append(Spark(self.projectiles[0][0],random.random()- 0.5 + (math.pi if projectile[1] > 0 else 0), 2+random.random()))
+                self.projectiles.remove(projectile)
+            elif not self.player.is_hurt and not self.player.is_dead:
+                if self.player.rect.collidepoint(projectile[0]): #if player collides with the projectile 
+                    if self.player.ring_count != 0: # if player has rings, get hurt
+                        self.player.is_hurt = True
+
+                        self.hurt_time = self.game_clock.ticks()
+                        self.player.hurt()
+                        self.hurt_frames += 1
+                        self.player.ring_count = 0
+                    
+                    elif self.player.ring_count == 0: # else lose a life from the player and restart level/quit back to main menu
+                        self.player.speed_y = 0
+                        self.player.die_anim()
+                        self.music.play_sound_effect(self.assets['sound_effect/sonic_die'])
+                        self.player.is_dead = True
+                        self.lives -= 1
+                        self.dead_frames += 1
+
+                    self.projectiles.remove(projectile)
+                    for i in range(30):
+                        angle = random.random() *math.pi *2
+                        self.sparks.append(Spark(self.player.rect.center,angle,2+random.random())) #player sparks blow up
+        
+        for spark in self.sparks.copy(): #any sparks generated from enemy or projectile collision is destroyed after set frame period after being created
+            kill = spark.update()
+            if kill:
+                self.sparks.remove(spark)
+
+        # Checks and updates ring entities
+        for ring in self.rings.copy():
+            kill = ring.update(self.level_map) #remove the ring from the screen
+            if kill:
+                self.rings.remove(ring)
+
+        # Checks and updates goal post
+        for sprite in self.level_map.goalpost_sprite:
+            #Check if player collides with the goal post signifying the end of the level
+            if self.player.rect.colliderect(sprite.rect):
+                sprite.spin = True
 
-                self.hurt_frames = 0
-                self.player.is_hurt = False
+            sprite.animation()
+        
+            if sprite.spin:
+                self.end_game = True #Level completes
+                self.end_frames += 1
 
-            #Substep values to make smaller incremental movements per frame rather than one large movement
-            subspeed_x = self.player.speed /self.substep_val
-            subspeed_y = self.player.speed_y/self.substep_val
+        #If player gets hurt, generate some sparks 
+        if self.hurt_frames>0:
+            for i in range(4):
+                angle = random.random() *math.pi *2
+                self.sparks.append(Spark(self.player.rect.center,angle,2+random.random()))
+            self.hurt_frames += 1
+        if self.hurt_frames == 120: #After 3 seconds, stop hurt aimation
+            for i in range(4):
+                angle = random.random() *math.pi *2
+                self.sparks.append(Spark(self.player.rect.center,angle,2+random.random()))
+
+            self.hurt_frames = 0
+            self.player.is_hurt = False
+
+        #Substep values to make smaller incremental movements per frame rather than one large movement
+        subspeed_x = self.player.speed /self.substep_val
+        subspeed_y = self.player.speed_y/self.substep_val
+        
+        if not self.player.is_dead:
+            for i in range(self.substep_val): #Goes through each substep value 60x in a frame
+                #Performs smaller movements and add to the player position
+                substep_movement = subspeed_x / self.substep_val
             
-            if not self.player.is_dead:
-                for i in range(self.substep_val): #Goes through each substep value 60x in a frame
-                    #Performs smaller movements and add to the player position
-                    substep_movement = subspeed_x / self.substep_val
-                
-                    if self.player.rect.left < self.level_start_x:
-                        self.player.rect.x = self.level_start_x + 2
-                        self.player.speed_y = 0
-                    if self.player.rect.right >self.level_end_x:
-                        self.player.rect.x = self.level_end_x - 32
-                        self.player.speed_y = 0
+                if self.player.rect.left < self.level_start_x:
+                    self.player.rect.x = self.level_start_x + 2
+                    self.player.speed_y = 0
+                if self.player.rect.right >self.level_end_x:
+                    self.player.rect.x = self.level_end_x - 32
+                    self.player.speed_y = 0
 
-                    self.player.rect.x += substep_movement
-                    self.player.detect_wall(self.level_map) #Check for collision after smaller movement
+                self.player.rect.x += substep_movement
+                self.player.detect_wall(self.level_map) #Check for collision after smaller movement
 
-                    substep_movement_y = subspeed_y / self.substep_val
+                substep_movement_y = subspeed_y / self.substep_val
 
-                    # Move the player vertically and check for ground collisions
-                    self.player.rect.y += substep_movement_y
-                    self.player.detect_ground(self.level_map)
+                # Move the player vertically and check for ground collisions
+                self.player.rect.y += substep_movement_y
+                self.player.detect_ground(self.level_map)
 
 
-            # Call the player-entity(springs, rings) collision methods
-            if not self.player.is_dead:
-                self.player.spring_collision(self.level_map, self.music, self.screen)
-                self.player.ring_collision(self.level_map,self.music,coll_type=None)
-            
-                if current_time - self.hurt_time > 2500:
-                    self.player.ring_collision(self.level_map,self.music,coll_type=True)
+        # Call the player-entity(springs, rings) collision methods
+        if not self.player.is_dead:
+            self.player.spring_collision(self.level_map, self.music, self.screen)
+            self.player.ring_collision(self.level_map,self.music,coll_type=None)
+        
+            if current_time - self.hurt_time > 2500:
+                self.player.ring_collision(self.level_map,self.music,coll_type=True)
 
-                if self.player.ring_count != 0:
-                    if self.player.ring_count % 100 ==0:
-                        self.player.add_life()
-                        self.music.play_sound_effect(random.choice(self.sonic_sounds))
-                
-                if self.player.score != 0:
-                    if self.player.score % 10000 == 0: #For every 10,000 in score, Sonic audio is played to let player know they are progressing
-                        self.music.play_sound_effect(random.choice(self.sonic_sounds))
+            if self.player.ring_count != 0:
+                if self.player.ring_count % 100 ==0:
+                    self.player.add_life()
+                    self.music.play_sound_effect(random.choice(self.sonic_sounds))
             
-            # Displays relevant game information
-            self.display.ingame_display(self.game_screen,self.player.ring_count,self.player.score,self.lives,start_time)
-
-            # Idle animation timers
-            if self.player.idle or self.player.bored or self.player.bored1:
-                if self.elapsed_time >= 4000:
-                    self.player.bored = True
-                    self.player.bored1 = False
-                if self.elapsed_time >= 16000:
-                    self.player.bored = False
-                    self.player.bored1 = True
-                if self.player.bored1 and not self.player.idle:
-                    self.player.bored1 = False
-            else:
-                self.elapsed_time = 0
+            if self.player.score != 0:
+                if self.player.score % 10000 == 0: #For every 10,000 in score, Sonic audio is played to let player know they are progressing
+                    self.music.play_sound_effect(random.choice(self.sonic_sounds))
+        
+        # Keeps the game information up to date (drawn in draw())
+        self.display.update_values(self.player.ring_count,self.player.score,self.lives,self.start_time)
+
+        # Idle animation timers
+        if self.player.idle or self.player.bored or self.player.bored1:
+            if self.elapsed_time >= 4000:
+                self.player.bored = True
+                self.player.bored1 = False
+            if self.elapsed_time >= 16000:
                 self.player.bored = False
+                self.player.bored1 = True
+            if self.player.bored1 and not self.player.idle:
                 self.player.bored1 = False
-
-            # Movement handling
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == pygame.KEYDOWN and not self.player.lock_controls:
-                    if event.key == pygame.K_w:
-                        if self.player.is_grounded:
-                            self.player.is_lookup = True
-                    if event.key == pygame.K_s:
-                        if self.player.is_grounded:
-                            if not self.player.is_crouching and self.player.is_grounded:
-                                #Crouch
-                                self.player.is_crouching = True
-                                self.s_key_hold = True
-
-                                #Roll if moving in a direction/crouching while moving    
-                                if (self.player.direction.x != 0 or self.player.speed !=0) and self.player.is_crouching:
-                                    self.player.rolling()
-                            else:
-                                self.player.is_crouching = False
-                                self.player.is_rolling = False
-                                
-                    if event.key == pygame.K_o: # Spindash if player is pressing s, and hasn't moved
-                        if self.s_key_hold and self.player.direction.x == 0 and self.player.speed == 0:
+        else:
+            self.elapsed_time = 0
+            self.player.bored = False
+            self.player.bored1 = False
+
+        # Movement handling
+        for event in self.input.events():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+            if event.type == pygame.KEYDOWN and not self.player.lock_controls:
+                if event.key == pygame.K_w:
+                    if self.player.is_grounded:
+                        self.player.is_lookup = True
+                if event.key == pygame.K_s:
+                    if self.player.is_grounded:
+                        if not self.player.is_crouching and self.player.is_grounded:
+                            #Crouch
+                            self.player.is_crouching = True
+                            self.s_key_hold = True
+
+                            #Roll if moving in a direction/crouching while moving    
+                            if (self.player.direction.x != 0 or self.player.speed !=0) and self.player.is_crouching:
+                                self.player.rolling()
+                        else:
                             self.player.is_crouching = False
                             self.player.is_rolling = False
-                            self.player.is_charging_spindash = True
-                            self.music.play_sound_effect(self.assets['sound_effect/spindash'])
-
-                        if not self.player.is_jumping and self.player.is_grounded and not self.player.is_charging_spindash: #Make player jump
-                            self.player.direction.y = -1
-                            self.player.is_jumping = True
-                            self.player.is_springjump = False
-                            self.player.is_grounded = False
-                            self.player.is_crouching = False
-
-                            #to reset the homing dash
-                            self.player.is_homingdash = False
-                            self.player.jump()
-                
-                if event.type == pygame.KEYUP and not self.player.lock_controls:
-                    if event.key == pygame.K_w:
-                        if self.player.is_grounded:
-                            self.player.is_lookup = False
-                        
-                    if event.key == pygame.K_s: #No longer crouching while spindashing accelerates player forward as spindash is executed
-                        self.s_key_hold = False
-                        if self.player.is_grounded and self.player.is_charging_spindash and self.player.direction.x == 0 and self.player.speed == 0:
-                          self.music.play_sound_effect(self.assets['sound_effect/spindashfinish'])
-                          self.player.is_charging_spindash = False 
-                          self.player.is_spindashing = True
-                        else:
-                            self.player.is_charging_spindash = False
-
+                            
+                if event.key == pygame.K_o: # Spindash if player is pressing s, and hasn't moved
+                    if self.s_key_hold and self.player.direction.x == 0 and self.player.speed == 0:
+                        self.player.is_crouching = False
                         self.player.is_rolling = False
-                        self.player.is_crouching = False                         
+                        self.player.is_charging_spindash = True
+                        self.music.play_sound_effect(self.assets['sound_effect/spindash'])
+
+                    if not self.player.is_jumping and self.player.is_grounded and not self.player.is_charging_spindash: #Make player jump
+                        self.player.direction.y = -1
+                        self.player.is_jumping = True
+                        self.player.is_springjump = False
+                        self.player.is_grounded = False
+                        self.player.is_crouching = False
+
+                        #to reset the homing dash
+                        self.player.is_homingdash = False
+                        self.player.jump()
             
-            self.camera_group.update()  #Update player camera + display
-            if not self.player.is_dead:  
-                self.camera_group.custom_draw(self.player)  
-            else:
-                self.game_screen.blit(pygame.transform.rotate(pygame.transform.flip(self.player.animation.img(),self.player.flip,False),self.player.angle),(self.player.rect.x - self.camera_group.offset.x, self.player.rect.y - self.camera_group.offset.y))   
+            if event.type == pygame.KEYUP and not self.player.lock_controls:
+                if event.key == pygame.K_w:
+                    if self.player.is_grounded:
+                        self.player.is_lookup = False
+                    
+                if event.key == pygame.K_s: #No longer crouching while spindashing accelerates player forward as spindash is executed
+                    self.s_key_hold = False
+                    if self.player.is_grounded and self.player.is_charging_spindash and self.player.direction.x == 0 and self.player.speed == 0:
+                      self.music.play_sound_effect(self.assets['sound_effect/spindashfinish'])
+                      self.player.is_charging_spindash = False 
+                      self.player.is_spindashing = True
+                    else:
+                        self.player.is_charging_spindash = False
 
-            self.screen.blit(pygame.transform.scale(self.game_screen, self.screen.get_size()), (0,0)) 
-            pygame.display.update()
-            self.clock.tick(60)
+                    self.player.is_rolling = False
+                    self.player.is_crouching = False                         
         
-        if not running:
-            self.loading("adventure")
-            self.music.play_music(self.assets['menu/music'])
+        self.camera_group.update()  #Update player
+        if not self.player.is_dead:
+            self.camera_group.box_camera(self.player) #camera follows the player, streaming and culling go by it
+        return running
+
+    def draw_interpolated(self,alpha):
+        #Draws the player and camera part of the way from where they were before the last step to where they are now
+        #Snaps straight there if they jumped, e.g. the level restarting
+        topleft = self.player.rect.topleft
+        player_pos = pygame.math.Vector2(topleft)
+        offset = self.camera_group.offset.copy()
+        previous_player_pos,previous_offset = self.previous_positions
+        if player_pos.distance_to(previous_player_pos) > 64 or offset.distance_to(previous_offset) > 64:
+            self.draw()
+            return
+
+        drawn_offset = previous_offset.lerp(offset,alpha)
+        drawn_player_pos = previous_player_pos.lerp(player_pos,alpha)
+        self.camera_group.offset.update(round(drawn_offset.x),round(drawn_offset.y))
+        self.player.rect.topleft = (round(drawn_player_pos.x),round(drawn_player_pos.y))
+        self.draw()
+        self.camera_group.offset.update(offset)
+        self.player.rect.topleft = topleft
+
+    def draw(self):
+        #Draws the current frame of the level onto the game screen, changes nothing in the game
+        #Anything that moves or animates has to be done in step(), draw() can run any number of times between steps
+        self.parallax.draw(self.camera_group.offset)
+        self.level_map.update(self.camera_group)
+
+        if self.start_game: #3..2..1..go!
+            centre = (self.game_screen.get_width()//2,self.game_screen.get_height()//2)
+            if self.countdown >= 0:
+                self.game_screen.blit(render(f'{(self.countdown // 1000)+1}',self.display.display_font_black),centre)
+            else:
+                self.game_screen.blit(render("GO!!!",self.display.display_font_orange,gfcolor=pygame.Color("orange")),centre)
+
+        if self.dead_frames > 160 and self.lives == 0:
+            self.gameover()
+        if self.end_game and self.end_frames > 360 and self.score_texts is not None:
+            self.display_score(*self.score_texts[:6])
+
+        for particle in self.particles:
+            particle.render(self.game_screen,offset=(0,0))
+
+        #Entities off screen are still updated in step(), only the drawing is culled
+        culling = self.level_map.culling
+        offset = (self.camera_group.offset.x,self.camera_group.offset.y)
+        for chao in self.level_map.chao_sprites:
+            if culling.check('chao_sprites',chao.rect()):
+                chao.render(self.game_screen,offset=offset)
+
+            if self.chao_interact:
+                if self.player.rect.x < 700:
+                    self.game_screen.blit(self.assets['op'],(256,230)) #displays tutorial prompt
+                else:
+                    self.game_screen.blit(self.assets['so'],(400,150)) #displays tutorial prompt
+
+        for enemy in self.level_map.enemy_sprites:
+            if culling.check('enemy_sprites',enemy.rect()):
+                enemy.render(self.game_screen,offset=(offset[0],offset[1]+16))
+
+        img = self.assets['projectile']
+        for projectile in self.projectiles:
+            if culling.check('projectiles',(projectile[0][0],projectile[0][1],1,1)):
+                self.game_screen.blit(img,(projectile[0][0] - img.get_width()/2 - offset[0], projectile[0][1] - img.get_height()/2-offset[1]))
+
+        for spark in self.sparks:
+            if culling.check('sparks',(spark.pos[0],spark.pos[1],1,1)):
+                spark.render(self.game_screen,offset=offset)
+
+        for ring in self.rings:
+            if culling.check('rings',ring.rect()):
+                ring.render(self.game_screen,offset=offset)
+
+        for sprite in self.level_map.goalpost_sprite:
+            if culling.check('goalpost_sprite',sprite.rect):
+                self.game_screen.blit(sprite.image,(sprite.rect.x - offset[0], sprite.rect.y - offset[1]))
+
+        # Displays relevant game information
+        self.display.ingame_display(self.game_screen)
+
+        if not self.player.is_dead:  
+            self.camera_group.custom_draw(self.player)  
+        else:
+            self.game_screen.blit(transformed(self.player.animation.img(),self.player.flip,self.player.angle),(self.player.rect.x - self.camera_group.offset.x, self.player.rect.y - self.camera_group.offset.y))   
 
 #Instantiate the game
-game = Game()
-game.main_menu()
+def main():
+    game = Game()
+    game.main_menu()
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,93 @@
 import pygame
-pygame.init()
+import time
+
+from game_data import sound_bank
+from audio_cache import load_sound
+
+#Sound effects decoded once and kept, instead of decoding the file every time one plays
+#Effects play on channels set aside for the bank, each effect can only have so many copies playing at once,
+#and the same effect asked for again within coalesce_ms (e.g. several rings in one frame) only plays once
+class SoundBank:
+    def __init__(self,channels=16,reserved=12,voice_limit=2,voice_limits=None,coalesce_ms=16,pcm_cache=True):
+        pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(reserved) #Sound.play() on its own never picks these, so only the bank uses them
+        self.channels = [pygame.mixer.Channel(i) for i in range(reserved)]
+        self.started = [None] * reserved #channel index --> (sound file, when it started)
+
+        self.voice_limit = voice_limit
+        self.voice_limits = voice_limits or {} #sound file --> most copies playing at once, if not voice_limit
+        self.coalesce_ms = coalesce_ms
+        self.pcm_cache = pcm_cache #load through audio_cache so the decoding is only ever done once
+        self.sounds = {} #sound file --> pygame.mixer.Sound
+        self.last_played = {} #sound file --> ticks
+
+        #counters
+        self.decode_times = {} #sound file --> seconds taken to decode it (or read it from the cache)
+        self.lazy_loads = 0
+        self.plays = 0
+        self.coalesced = 0
+        self.steals = 0
+
+    def load(self,sound_files):
+        #Decodes them all up front so none have to be decoded in the middle of a level
+        for sound_file in sound_files:
+            self.sound(sound_file)
+
+    def sound(self,sound_file):
+        if sound_file not in self.sounds:
+            start = time.perf_counter()
+            self.sounds[sound_file] = load_sound(sound_file) if self.pcm_cache else pygame.mixer.Sound(sound_file)
+            self.decode_times[sound_file] = time.perf_counter() - start
+        return self.sounds[sound_file]
+
+    def play(self,sound_file):
+        now = pygame.time.get_ticks()
+        if sound_file in self.last_played and now - self.last_played[sound_file] < self.coalesce_ms:
+            self.coalesced += 1
+            return None
+
+        if sound_file not in self.sounds:
+            self.lazy_loads += 1
+        sound = self.sound(sound_file)
+        index = self.free_channel(sound_file)
+        self.channels[index].play(sound)
+        self.started[index] = (sound_file,now)
+        self.last_played[sound_file] = now
+        self.plays += 1
+        return self.channels[index]
+
+    def free_channel(self,sound_file):
+        #An idle channel, unless the effect is at its limit or every channel is busy,
+        #then the copy that has been playing longest is cut off and its channel reused
+        busy = [index for index,channel in enumerate(self.channels) if channel.get_busy() and self.started[index]]
+        voices = [index for index in busy if self.started[index][0] == sound_file]
+        if len(voices) >= self.voice_limits.get(sound_file,self.voice_limit):
+            self.steals += 1
+            return min(voices,key=lambda index: self.started[index][1])
+
+        for index,channel in enumerate(self.channels):
+            if index not in busy:
+                return index
+        self.steals += 1
+        return min(busy,key=lambda index: self.started[index][1])
+
+    def stats(self):
+        slowest = max(self.decode_times,key=self.decode_times.get,default=None)
+        return {
+            'sounds': len(self.sounds),
+            'decode ms': round(sum(self.decode_times.values()) * 1000,1),
+            'slowest': (slowest,round(self.decode_times[slowest] * 1000,1)) if slowest else None,
+            'lazy loads': self.lazy_loads,
+            'plays': self.plays,
+            'coalesced': self.coalesced,
+            'steals': self.steals,
+        }
 
 class Music:
     def __init__(self):
         pygame.mixer.pre_init()
         pygame.mixer.init()
+        self.bank = SoundBank(sound_bank['channels'],sound_bank['reserved'],sound_bank['voice limit'],sound_bank['voice limits'],sound_bank['coalesce ms'],sound_bank['pcm cache'])
 
         #in game music files
         self.green_grove = "audio/05. Leaf Forest Zone - Act 1.mp3"
@@ -12,6 +95,8 @@ class Music:
         #sound effects
         self.rings = "audio/sonic_ring_sound_effect.mp3"
         self.spring = "audio/sonic-spring.mp3"
+        if sound_bank['preload']:
+            self.bank.load([self.rings,self.spring])
 
     def play_background_music(self): #Plays main music in bg
         pygame.mixer.music.load(self.green_grove)
@@ -22,8 +107,7 @@ class Music:
         pygame.mixer.music.play(-1)
   
     def play_sound_effect(self,sound_file): #Plays sound effect. Does not overwrite the bg music playing
-        sound = pygame.mixer.Sound(sound_file)
-        sound.play()
+        return self.bank.play(sound_file)
     
     def stop(self):
         pygame.mixer.music.stop()
@@ -0,0 +1,67 @@
+import math
+import pygame
+
+#Background layer made from one image repeated along the x axis
+#The image is copied side by side into a strip once, wide enough to cover the screen from any position,
+#so drawing the layer is always one blit however wide the image or the screen is
+class TiledLayer:
+    def __init__(self,image,depth,y,view_width):
+        self.depth = depth #how far it moves per pixel the camera moves, 0 stays still
+        self.y = y
+        self.tile_width = image.get_width()
+
+        count = math.ceil(view_width / self.tile_width) + 1
+        self.strip = pygame.Surface((count * self.tile_width, image.get_height()), image.get_flags() & pygame.SRCALPHA, image)
+        if image.get_colorkey() is not None:
+            self.strip.set_colorkey(image.get_colorkey())
+        self.strip.blits([(image,(i * self.tile_width,0)) for i in range(count)],doreturn=False)
+
+    def update(self):
+        pass
+
+    def draw(self,surface,offset):
+        shift = math.floor(-offset[0] * self.depth)
+        surface.blit(self.strip,(shift % self.tile_width - self.tile_width, self.y))
+        return 1
+
+#Background objects placed once each, [depth, [x,y,w,h], image] the same as Game.background_objects
+#Drawn in the order given, but only the ones that are on screen after their own parallax shift
+class ObjectLayer:
+    def __init__(self,objects):
+        self.objects = [(depth,rect[0],rect[1],image) for depth,rect,image in objects]
+
+    def update(self):
+        pass
+
+    def draw(self,surface,offset):
+        width,height = surface.get_size()
+        blits = []
+        for depth,x,y,image in self.objects:
+            x -= offset[0] * depth
+            y -= offset[1] * depth
+            if x < width and y < height and x + image.get_width() > 0 and y + image.get_height() > 0:
+                blits.append((image,(x,y)))
+        surface.blits(blits,doreturn=False)
+        return len(blits)
+
+#Everything behind the level, drawn back to front onto the game screen each frame
+#Layers need update() and draw(surface,offset) which returns how many blits it did
+class Parallax:
+    def __init__(self,surface,layers,sky=(0,152,248)):
+        self.surface = surface
+        self.layers = layers
+        self.sky = sky
+        self.blits = 0 #last frame
+
+    def update(self):
+        for layer in self.layers:
+            layer.update()
+
+    def draw(self,offset):
+        self.surface.fill(self.sky)
+        self.blits = 0
+        for layer in self.layers:
+            self.blits += layer.draw(self.surface,offset)
+
+    def stats(self):
+        return {'layers': len(self.layers), 'blits': self.blits}
@@ -37,7 +37,7 @@ class PhysicsEntity(pygame.sprite.Sprite):
         self.pos[0] += frame_movement[0]
         entity_rect = self.rect()
 
-        for rect in level_map.rect_dict: #Check horizontal rect collision, resolve (walls)
+        for rect in level_map.terrain_grid.query_rect(entity_rect.inflate(entity_rect.width*2,0)): #Check horizontal rect collision with nearby tiles, resolve (walls)
             if entity_rect.colliderect(level_map.rect_dict[rect]):
                 if frame_movement[0]>0:
                     entity_rect.right = level_map.rect_dict[rect].left
@@ -50,7 +50,7 @@ class PhysicsEntity(pygame.sprite.Sprite):
         self.pos[1]+= frame_movement[1]
         entity_rect = self.rect()
 
-        for rect in level_map.rect_dict: #Check vertical rect collision, resolve (ceilings and floors)
+        for rect in level_map.terrain_grid.query_rect(entity_rect.inflate(0,entity_rect.height*2)): #Check vertical rect collision with nearby tiles, resolve (ceilings and floors)
             if entity_rect.colliderect(level_map.rect_dict[rect]):
                 if frame_movement[1]>0:
                     entity_rect.bottom = level_map.rect_dict[rect].top
@@ -73,7 +73,7 @@ class PhysicsEntity(pygame.sprite.Sprite):
         self.animation.update()
     
     def render(self,surface,offset=(0,0)): #Update their image onto the screen surface
-        surface.blit(pygame.transform.flip(self.animation.img(),self.flip,False) ,(self.pos[0]-offset[0]+self.animation_offset[0],self.pos[1]-offset[1]+self.animation_offset[1]))
+        surface.blit(self.animation.img(self.flip) ,(self.pos[0]-offset[0]+self.animation_offset[0],self.pos[1]-offset[1]+self.animation_offset[1]))
     
     def set_action(self,action):
         if action != self.action:
@@ -119,7 +119,23 @@ class Enemy(PhysicsEntity):
 
         self.walking = 0
         self.cooldown = 0
+
+        #spawn state, put back by reset() when the level restarts
+        self.spawn_pos = tuple(self.pos)
+        self.spawn_animation = self.animation
     
+    def reset(self):
+        #Resets the enemy in place to how it was placed in the level
+        self.pos.update(self.spawn_pos)
+        self.velocity.update(0,0)
+        self.flip = False
+        self.walking = 0
+        self.cooldown = 0
+        self.action = 'idle'
+        self.animation = self.spawn_animation
+        self.animation.frame = 0
+        self.animation.done = False
+
     def update(self,level_map,movement=(0,0)):
         if self.walking:
             if level_map.solid_check((self.rect().x+(-8 if self.flip else 8), self.pos[1]+20)):
@@ -216,7 +232,7 @@ class RingObject():
         self.pos[0] += frame_movement[0]
         entity_rect = self.rect()
 
-        for rect in level_map.rect_dict:
+        for rect in level_map.terrain_grid.query_rect(entity_rect.inflate(entity_rect.width*2,0)): #Only the tiles near the ring
             if entity_rect.colliderect(level_map.rect_dict[rect]):
                 if frame_movement[0]>0:
                     entity_rect.right = level_map.rect_dict[rect].left
@@ -229,7 +245,7 @@ class RingObject():
         self.pos[1]+= frame_movement[1]
         entity_rect = self.rect()
 
-        for rect in level_map.rect_dict: #Checks collision
+        for rect in level_map.terrain_grid.query_rect(entity_rect.inflate(0,entity_rect.height*2)): #Checks collision with nearby tiles
             if entity_rect.colliderect(level_map.rect_dict[rect]):
                 if frame_movement[1]>0:
                     entity_rect.bottom = level_map.rect_dict[rect].top
@@ -249,17 +265,17 @@ class RingObject():
         self.animation.update()
 
         if not self.timer_started:
-            self.timer_start_time = pygame.time.get_ticks()
+            self.timer_start_time = self.game.game_clock.ticks()
             self.timer_started = True
 
         # Check if the timer duration has passed, and if so, indicate that the ring should be removed
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.game_clock.ticks()
         elapsed_time = current_time - self.timer_start_time
         if elapsed_time >= self.timer:
             return True 
         
     def render(self,surface,offset=(0,0)):
-        surface.blit(pygame.transform.flip(self.animation.img(),self.flip,False) ,(self.pos[0]-offset[0]+self.animation_offset[0],self.pos[1]-offset[1]+self.animation_offset[1]))
+        surface.blit(self.animation.img(self.flip) ,(self.pos[0]-offset[0]+self.animation_offset[0],self.pos[1]-offset[1]+self.animation_offset[1]))
     
     def set_action(self,action):
         if action != self.action:
@@ -356,11 +372,11 @@ class Player(pygame.sprite.Sprite, Collision):
 
     def control_lock(self, time):
         self.lock_controls = True
-        self.lock_timer = pygame.time.get_ticks() + time  # Set the timer to the current time + lock duration
+        self.lock_timer = self.game.game_clock.ticks() + time  # Set the timer to the current time + lock duration
 
     def update_control_lock(self):
         if self.lock_controls:
-            current_time = pygame.time.get_ticks()
+            current_time = self.game.game_clock.ticks()
             if current_time >= self.lock_timer:
                 self.lock_controls = False
 
@@ -405,7 +421,7 @@ class Player(pygame.sprite.Sprite, Collision):
         surface.fill((255,0,0),self.wall_detect_rects.move(shift.x - self.rect.x ,shift.y - self.rect.y ))
             
     def get_input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.game.input.pressed()
         
         #Moving left/right
         if keys[pygame.K_d] and not self.lock_controls:
@@ -0,0 +1,116 @@
+import pygame
+import time
+
+#Ways of getting the 550x380 game screen onto the 720x500 window
+#scale --> nearest scaling straight into a surface made once, no new surface every frame
+#smooth --> same but with smoothscale, looks softer but costs more
+#integer --> scaled by the biggest whole number that fits (nearest), centred with black bars round it
+#scaled --> the window is switched to the game screen size with the SCALED flag so the graphics card does the scaling
+modes = ('scale','smooth','integer','scaled')
+
+#Final step of every frame in a level, puts the game screen on the window and updates the display
+#'auto' times the modes in its order on the first frames and keeps the first one that fits the budget
+#Only the scaling is timed, display.update waits on the screen the same whichever mode is used
+class Presenter:
+    def __init__(self,game,mode='scale',order=('scale','integer'),budget_ms=2,trial_frames=30):
+        self.game = game
+        self.source = game.game_screen
+        self.window_size = game.screen.get_size()
+        self.setting = mode
+        self.order = order #auto tries these in order, nearest scaling first so the pixel art stays sharp
+        self.budget = budget_ms / 1000
+        self.trial_frames = trial_frames
+        self.mode = None
+
+        #counters
+        self.frames = 0
+        self.timings = {} #mode --> [frames, seconds]
+
+    def start(self):
+        #Called as a level starts, sets up the surfaces for the mode so nothing is made while playing
+        self.trials = list(self.order) if self.setting == 'auto' else []
+        self.set_mode(self.trials.pop(0) if self.trials else self.setting)
+
+    def stop(self):
+        #Called as a level ends, puts the window back for the menus
+        if self.mode == 'scaled':
+            self.game.screen = pygame.display.set_mode(self.window_size)
+        self.mode = None
+
+    def set_mode(self,mode):
+        if mode not in modes:
+            raise ValueError(f"unknown presentation mode {mode!r}, expected one of {modes} or 'auto'")
+
+        if self.mode == 'scaled' and mode != 'scaled':
+            self.game.screen = pygame.display.set_mode(self.window_size)
+        elif mode == 'scaled' and self.mode != 'scaled':
+            self.game.screen = pygame.display.set_mode(self.source.get_size(),pygame.SCALED)
+        self.mode = mode
+        screen = self.game.screen
+
+        if mode in ('scale','smooth'):
+            self.dest = self.target(screen,screen.get_size())
+            self.dest_pos = (0,0)
+        elif mode == 'integer':
+            factor = max(1,min(screen.get_width() // self.source.get_width(), screen.get_height() // self.source.get_height()))
+            size = (self.source.get_width() * factor, self.source.get_height() * factor)
+            self.dest = self.target(None,size) if factor > 1 else None
+            self.dest_pos = ((screen.get_width() - size[0]) // 2, (screen.get_height() - size[1]) // 2)
+            self.dest_rect = pygame.Rect(self.dest_pos,size)
+            screen.fill((0,0,0)) #the bars only need drawing once
+            pygame.display.update()
+        else:
+            self.dest = None
+            self.dest_pos = (0,0)
+
+    def target(self,screen,size):
+        #Scaling straight into the window only works when it has the same pixel format as the game screen,
+        #otherwise a surface of the right size is made once here and blitted across
+        if screen is not None and screen.get_bitsize() == self.source.get_bitsize() and screen.get_masks() == self.source.get_masks():
+            return screen
+        return pygame.Surface(size,0,self.source)
+
+    def present(self):
+        start = time.perf_counter()
+        screen = self.game.screen
+
+        if self.mode == 'scale':
+            pygame.transform.scale(self.source,self.dest.get_size(),self.dest)
+        elif self.mode == 'smooth':
+            pygame.transform.smoothscale(self.source,self.dest.get_size(),self.dest)
+        elif self.mode == 'integer' and self.dest is not None:
+            pygame.transform.scale(self.source,self.dest.get_size(),self.dest)
+
+        if self.mode == 'scaled' or (self.mode == 'integer' and self.dest is None):
+            screen.blit(self.source,self.dest_pos)
+        elif self.dest is not screen:
+            screen.blit(self.dest,self.dest_pos)
+        seconds = time.perf_counter() - start
+
+        if self.mode == 'integer':
+            pygame.display.update(self.dest_rect)
+        else:
+            pygame.display.update()
+
+        self.frames += 1
+        timing = self.timings.setdefault(self.mode,[0,0])
+        timing[0] += 1
+        timing[1] += seconds
+        self.check_trial(timing)
+
+    def check_trial(self,timing):
+        #While on auto, a mode that has had its trial frames is kept if it was within budget, else the next one is tried
+        if self.setting != 'auto' or timing[0] < self.trial_frames or self.mode not in self.order:
+            return
+        if timing[1] / timing[0] > self.budget and self.trials:
+            self.set_mode(self.trials.pop(0))
+        else:
+            self.trials = []
+            self.order = (self.mode,) #stays on this mode for the next levels too
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'frames': self.frames,
+            'ms per frame': {mode: round(seconds * 1000 / frames,3) for mode,(frames,seconds) in self.timings.items()},
+        }
@@ -0,0 +1,75 @@
+import pygame
+
+#Where the level gets its input and its time from
+#The game normally uses LiveInput, headless.py swaps in ScriptedInput
+#Game time is always a SimClock moved on once per level step, so timers run at the same speed however fast the screen is drawn
+
+class LiveInput:
+    #The keyboard, read the same way the game always did
+    def events(self):
+        return pygame.event.get()
+
+    def pressed(self):
+        return pygame.key.get_pressed()
+
+class KeyState:
+    #Works like the list pygame.key.get_pressed() returns, keys[pygame.K_d] --> True/False
+    def __init__(self,held):
+        self.held = held
+
+    def __getitem__(self,key):
+        return key in self.held
+
+class ScriptedInput:
+    #Presses and lets go of keys on set frames
+    #script --> list of (frame, key, down), e.g. [(0,pygame.K_d,True),(120,pygame.K_o,True),(124,pygame.K_o,False)]
+    def __init__(self,script):
+        self.script = sorted(script,key=lambda action: action[0])
+        self.frame = 0
+        self.next_action = 0
+        self.held = set()
+
+    def events(self):
+        #Called once a frame, gives the key presses for this frame as pygame events
+        events = []
+        while self.next_action < len(self.script) and self.script[self.next_action][0] <= self.frame:
+            frame,key,down = self.script[self.next_action]
+            if down:
+                self.held.add(key)
+                events.append(pygame.event.Event(pygame.KEYDOWN,key=key))
+            else:
+                self.held.discard(key)
+                events.append(pygame.event.Event(pygame.KEYUP,key=key))
+            self.next_action += 1
+        self.frame += 1
+        return events
+
+    def pressed(self):
+        return KeyState(set(self.held))
+
+class SimClock:
+    #Game time that only moves on when tick() is called, every frame is exactly 1/60th of a second long
+    def __init__(self,fps=60):
+        self.fps = fps
+        self.frames = 0
+
+    def ticks(self):
+        return self.frames * 1000 // self.fps
+
+    def tick(self):
+        self.frames += 1
+
+def load_script(path):
+    #Reads a script file, one action per line --> frame key down/up
+    #e.g. "120 o down", keys are pygame key names, # starts a comment
+    script = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            frame,key,state = line.split()
+            if state not in ('down','up'):
+                raise ValueError(f'{path}: expected down or up, got {state}')
+            script.append((int(frame),pygame.key.key_code(key),state == 'down'))
+    return script
@@ -0,0 +1,82 @@
+import math
+import pygame
+
+#Uniform grid over the level for finding what is near a position without looking at everything
+#Each grid cell is keyed by (x//cell_size, y//cell_size) and holds the keys of the objects overlapping it
+#Queries only return candidates, the caller still does the exact rect/mask test
+class SpatialGrid:
+    def __init__(self,cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {} #(column,row) --> list of keys
+        self.rects = {} #key --> rect it was inserted with
+        self.order = {} #key --> insertion number, so results come back in the same order as a full scan
+        self.count = 0
+
+    def cell_range(self,rect):
+        #Grid cells covered by a rect, a rect with no width or height still covers the cell it is in
+        size = self.cell_size
+        left,top = math.floor(rect[0]) // size, math.floor(rect[1]) // size
+        right = (math.ceil(rect[0] + max(rect[2],1)) - 1) // size
+        bottom = (math.ceil(rect[1] + max(rect[3],1)) - 1) // size
+        return range(left,right+1),range(top,bottom+1)
+
+    def insert(self,key,rect):
+        if key in self.rects:
+            self.remove(key)
+
+        self.rects[key] = pygame.Rect(rect)
+        self.order[key] = self.count
+        self.count += 1
+
+        columns,rows = self.cell_range(rect)
+        for column in columns:
+            for row in rows:
+                self.cells.setdefault((column,row),[]).append(key)
+
+    def remove(self,key):
+        rect = self.rects.pop(key,None)
+        if rect is None:
+            return
+        del self.order[key]
+
+        columns,rows = self.cell_range(rect)
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((column,row))
+                if cell:
+                    cell.remove(key)
+                    if not cell:
+                        del self.cells[(column,row)]
+
+    def collect(self,cells):
+        #Merges the keys of the given grid cells, without duplicates and in insertion order
+        found = set()
+        for cell in cells:
+            found.update(self.cells.get(cell,()))
+        if len(found) < 2:
+            return list(found)
+        return sorted(found,key=self.order.__getitem__)
+
+    def query_rect(self,rect):
+        columns,rows = self.cell_range(rect)
+        return self.collect((column,row) for column in columns for row in rows)
+
+    def query_point(self,pos):
+        #Positions are truncated the same way pygame does in collidepoint
+        return self.collect([(int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size)])
+
+    def query_segment(self,start,end):
+        #Walks along the segment in steps no longer than a cell, taking the cells each step passes over
+        steps = max(1,math.ceil(math.dist(start,end) / self.cell_size))
+        cells = []
+        previous = start
+        for step in range(1,steps+1):
+            point = (start[0] + (end[0]-start[0]) * step / steps, start[1] + (end[1]-start[1]) * step / steps)
+            left,top = min(previous[0],point[0]), min(previous[1],point[1])
+            columns,rows = self.cell_range((left,top,abs(point[0]-previous[0])+1,abs(point[1]-previous[1])+1))
+            cells.extend((column,row) for column in columns for row in rows)
+            previous = point
+        return self.collect(cells)
+
+    def __len__(self):
+        return len(self.rects)
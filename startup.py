@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import builtins
+from contextlib import contextmanager
+
+#Records how long each part of starting the game takes, for the startup report
+#Does nothing unless start() has been called, so the timing calls can stay in the game code
+#Imports are timed from the first time a module is imported, including everything it imports itself
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.stop_at_menu = False
+        self.start_time = 0
+        self.timings = [] #(kind, name, seconds)
+        self.original_import = builtins.__import__
+        self.folder = os.path.dirname(os.path.abspath(__file__)) #the game's own modules are the ones in here
+
+    def start(self,stop_at_menu=True):
+        self.enabled = True
+        self.stop_at_menu = stop_at_menu
+        self.start_time = time.perf_counter()
+        builtins.__import__ = self.timed_import
+
+    def stop(self):
+        builtins.__import__ = self.original_import
+        self.enabled = False
+
+    def timed_import(self,name,globals=None,locals=None,fromlist=(),level=0):
+        #Only imports made by the game's own modules, what libraries import inside themselves is counted in their time
+        if name in sys.modules or level or os.path.dirname(os.path.abspath((globals or {}).get('__file__',''))) != self.folder:
+            return self.original_import(name,globals,locals,fromlist,level)
+        start = time.perf_counter()
+        module = self.original_import(name,globals,locals,fromlist,level)
+        self.record('import',name,time.perf_counter() - start)
+        return module
+
+    def record(self,kind,name,seconds):
+        if self.enabled:
+            self.timings.append((kind,name,seconds))
+
+    @contextmanager
+    def time(self,kind,name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind,name,time.perf_counter() - start)
+
+    def menu_ready(self):
+        #Called once the first main menu frame is on screen, returns True if the menu should not carry on
+        if not self.enabled or any(kind == 'total' for kind,name,seconds in self.timings):
+            return False
+        self.record('total','time to menu',time.perf_counter() - self.start_time)
+        return self.stop_at_menu
+
+    def report(self):
+        #Every timing as a table, slowest first
+        lines = [f"{'ms':>9}  {'kind':<8}{'name'}"]
+        for kind,name,seconds in sorted(self.timings,key=lambda timing: -timing[2]):
+            lines.append(f'{seconds*1000:9.2f}  {kind:<8}{name}')
+        return '\n'.join(lines)
+
+profiler = StartupProfiler()
+
+if __name__ == '__main__':
+    #python startup.py --> starts the game up to the first menu frame, builds the level, then prints the report
+    #python startup.py report.txt --> also writes the report to that file
+    import startup
+    profiler = startup.profiler #the one the game modules import, not this script's own copy
+    profiler.start()
+    import main
+    game = main.Game()
+    game.main_menu()
+
+    with profiler.time('level','start_loading + finish_loading'):
+        game.start_loading()
+        game.finish_loading()
+    profiler.stop()
+
+    report = profiler.report()
+    print(report)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1],'w') as f:
+            f.write(report + '\n')
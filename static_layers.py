@@ -0,0 +1,80 @@
+import math
+import numpy
+import pygame
+
+from utilities import tile_size
+from tiles import drawn_rect
+
+#Layers that never change during play, in the order they are drawn
+#Split in two so the animated palm trees can still be drawn in between them
+strata = {
+    'lower': ('background_tile_sprites','background_sand_sprites'),
+    'upper': ('palmtrees_bg_static_sprites','terrain_sprites','grass_sprites','assets_sprites'),
+}
+
+#Composites the static layers of each loaded chunk into one surface per stratum when the chunk is loaded
+#Drawing the level is then a couple of blits per chunk on screen instead of one blit per tile
+class StaticLayers:
+    def __init__(self,level):
+        self.level = level
+        self.bakes = 0
+
+        #How many columns back a tile can be placed and still hang over into the next chunk
+        self.overhang_columns = math.ceil(self.widest_image() / tile_size)
+
+    def widest_image(self):
+        #Widest image any static layer uses, found by making one tile of every id the layers have in them
+        widest = tile_size
+        for layer,type,attribute in self.level.layers:
+            if any(attribute in attributes for attributes in strata.values()):
+                for val in numpy.unique(self.level.compiled.layer(layer)):
+                    if val != -1:
+                        sprite = self.level.create_tile_group(numpy.array([[val]]),type).sprites()[0]
+                        widest = max(widest,drawn_rect(sprite).width)
+        return widest
+
+    def bake(self,chunk):
+        #Each baked surface covers exactly the columns of its chunk, so chunks never overlap each other
+        #Tiles placed before the chunk can hang over into this one, so they are baked in too (clipped)
+        #Everything goes by the area the images cover, not the tile rects
+        level = self.level
+        left = chunk.first_column * tile_size
+        right = chunk.last_column * tile_size
+        first_column = max(0,chunk.first_column - self.overhang_columns)
+        layers = {attribute: (layer,type) for layer,type,attribute in level.layers}
+
+        chunk.baked = {}
+        for stratum,attributes in strata.items():
+            sprites = []
+            for attribute in attributes:
+                layer,type = layers[attribute]
+                layout = level.compiled.layer(layer)[:,first_column:chunk.first_column]
+                overhang = level.create_tile_group(layout,type,first_column).sprites()
+
+                #same order as the whole layer would be drawn in, row by row
+                layer_sprites = [sprite for sprite in chunk.sprites[attribute] + overhang if drawn_rect(sprite).right > left and drawn_rect(sprite).left < right]
+                layer_sprites.sort(key=lambda sprite: sprite.spawn_key[1:])
+                sprites.extend(layer_sprites)
+
+            if not sprites:
+                continue
+
+            top = min(drawn_rect(sprite).top for sprite in sprites)
+            bottom = max(drawn_rect(sprite).bottom for sprite in sprites)
+            region = pygame.Rect(left,top,right-left,bottom-top)
+
+            surface = pygame.Surface(region.size,pygame.SRCALPHA)
+            surface.blits([(sprite.image,(sprite.rect.x - left,sprite.rect.y - top)) for sprite in sprites],doreturn=False)
+            chunk.baked[stratum] = (surface,region)
+
+        self.bakes += 1
+
+    def draw(self,stratum,camera):
+        #Blits the baked surfaces of one stratum that are on screen
+        surface = self.level.display_surface
+
+        for chunk in self.level.streamer.resident.values():
+            if stratum in chunk.baked:
+                baked,region = chunk.baked[stratum]
+                if self.level.culling.check('static '+stratum,region):
+                    surface.blit(baked,(region.x - camera.offset.x, region.y - camera.offset.y))
@@ -0,0 +1,139 @@
+import math
+from collections import OrderedDict
+
+from utilities import tile_size
+
+#Layers whose sprites can be removed during play (collected rings, killed enemies)
+#They are remembered so a chunk that is loaded again does not bring them back
+consumable_layers = ('rings_sprites','enemy_sprites')
+
+class Chunk:
+    def __init__(self,index,first_column,last_column):
+        self.index = index
+        self.first_column = first_column
+        self.last_column = last_column #not included
+        self.sprites = {} #sprite group attribute --> every sprite this chunk spawns, even ones already collected/killed
+        self.baked = {} #stratum --> (surface, level rect it covers) of the static layers
+
+#Splits the level into strips of columns and only keeps the strips near the camera loaded
+#Loading a chunk builds its sprites and collision data, evicting it takes them out of the level again
+class LevelStreamer:
+    def __init__(self,level,settings):
+        self.level = level
+        self.chunk_columns = settings['chunk columns']
+        self.budget = settings['resident chunks']
+        self.lookahead_frames = settings['lookahead frames']
+        self.margin = settings['margin']
+
+        self.chunk_width = self.chunk_columns * tile_size
+        columns = max(level.compiled.layer(layer).shape[1] for layer,type,attribute in level.layers)
+        self.chunk_count = max(1,math.ceil(columns / self.chunk_columns))
+
+        self.resident = OrderedDict() #chunk index --> Chunk, least recently wanted first
+        self.consumed = set() #spawn keys of rings/enemies that were collected or killed
+        self.last_offset = None
+
+        #counters
+        self.loads = 0
+        self.evictions = 0
+
+    def wanted_chunks(self,camera):
+        #Chunks overlapping the viewport plus a margin, stretched ahead in the direction the camera is moving
+        view_left = camera.offset.x
+        view_right = view_left + self.level.display_surface.get_width()
+
+        velocity = 0 if self.last_offset is None else camera.offset.x - self.last_offset
+        self.last_offset = camera.offset.x
+        ahead = velocity * self.lookahead_frames
+
+        left = view_left - self.margin + min(ahead,0)
+        right = view_right + self.margin + max(ahead,0)
+
+        first = max(0,math.floor(left / self.chunk_width))
+        last = min(self.chunk_count-1,math.floor(right / self.chunk_width))
+        return range(first,last+1)
+
+    def update(self,camera):
+        wanted = self.wanted_chunks(camera)
+
+        for index in wanted:
+            if index in self.resident:
+                self.resident.move_to_end(index)
+            else:
+                self.load(index)
+
+        #Evict chunks that are far away, then the furthest ones until within budget
+        #Chunks that are wanted this frame are never evicted, even if that goes over budget
+        spare = [index for index in self.resident if index not in wanted]
+        spare.sort(key=lambda index: -min(abs(index - wanted.start),abs(index - wanted.stop + 1)))
+        for index in spare:
+            distance = min(abs(index - wanted.start),abs(index - wanted.stop + 1))
+            if distance > 1 or len(self.resident) > self.budget:
+                self.evict(index)
+
+    def load(self,index):
+        level = self.level
+        first = index * self.chunk_columns
+        chunk = Chunk(index,first,first + self.chunk_columns)
+
+        for layer,type,attribute in level.layers:
+            layout = level.compiled.layer(layer)[:,chunk.first_column:chunk.last_column]
+            sprites = level.create_tile_group(layout,type,chunk.first_column).sprites()
+            chunk.sprites[attribute] = sprites #all of them are kept so a restart can bring the consumed ones back
+            getattr(level,attribute).add(sprite for sprite in sprites if sprite.spawn_key not in self.consumed)
+            level.culling.add(attribute,sprites) #the culling skips sprites that are not in the group
+
+            if attribute == 'terrain_sprites':
+                for tile in sprites:
+                    key = (tile.rect.x,tile.rect.y)
+                    level.terrain_cells[key] = tile
+                    level.terrain_grid.insert(key,tile.rect)
+
+        level.static_layers.bake(chunk)
+        self.resident[index] = chunk
+        self.loads += 1
+
+    def evict(self,index):
+        level = self.level
+        chunk = self.resident.pop(index)
+
+        for attribute,sprites in chunk.sprites.items():
+            group = getattr(level,attribute)
+            for sprite in sprites:
+                if sprite in group:
+                    group.remove(sprite)
+                elif attribute in consumable_layers:
+                    self.consumed.add(sprite.spawn_key) #removed during play, so it stays gone
+            level.culling.remove(attribute,sprites)
+
+            if attribute == 'terrain_sprites':
+                for tile in sprites:
+                    key = (tile.rect.x,tile.rect.y)
+                    del level.terrain_cells[key]
+                    level.terrain_grid.remove(key)
+
+        self.evictions += 1
+
+    def reset_entities(self):
+        #Brings back every collected ring and killed enemy
+        #A loaded chunk keeps every sprite it spawned, including ones consumed before it was loaded again,
+        #so they are all reset in place instead of being built again
+        #Chunks that are not loaded spawn everything fresh the next time they are loaded
+        self.consumed.clear()
+        self.last_offset = None
+        level = self.level
+
+        for chunk in self.resident.values():
+            for attribute in consumable_layers:
+                sprites = chunk.sprites[attribute]
+                for sprite in sprites:
+                    sprite.reset()
+                getattr(level,attribute).add(sprites)
+
+    def stats(self):
+        return {
+            'resident': len(self.resident),
+            'chunks': self.chunk_count,
+            'loads': self.loads,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,82 @@
+import os
+import pygame
+
+import support
+import cache
+from asset_pack import write_pack, AssetPack
+
+#A packed image that is edited afterwards has to come from the loose file, not the old pixels in the pack
+#The images here go through load_image keys, so the pack has to look for them in the image folder like support does
+
+def save_image(path,colour,size=(8,8)):
+    image = pygame.Surface(size,pygame.SRCALPHA)
+    image.fill(colour)
+    pygame.image.save(image,path)
+
+def load_loose(key):
+    return pygame.image.load(cache.source_path(key))
+
+def make_pack(tmp_path,keys):
+    path = str(tmp_path / 'assets.pak')
+    write_pack(path,{key: load_loose(key) for key in keys},cache.source_path)
+    return path
+
+def setup_images(tmp_path,monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(support,'BASE_IMG_PATH','images/')
+    os.makedirs('images/walk')
+    save_image('images/ring.png',(255,0,0,255))
+    save_image('images/walk/walk1.png',(0,255,0,255))
+
+def test_unchanged_images_come_from_the_pack(tmp_path,monkeypatch):
+    setup_images(tmp_path,monkeypatch)
+    key = ('ring.png','load_image')
+    asset_cache = cache.AssetCache(pack_path=make_pack(tmp_path,[key]))
+
+    image = asset_cache.get(key,lambda: load_loose(key))
+    assert image.get_at((0,0)) == (255,0,0,255)
+    assert asset_cache.stats()['pack hits'] == 1
+    assert asset_cache.stats()['pack stale'] == 0
+
+def test_edited_image_falls_back_to_the_loose_file(tmp_path,monkeypatch):
+    setup_images(tmp_path,monkeypatch)
+    key = ('ring.png','load_image')
+    pack_path = make_pack(tmp_path,[key])
+
+    save_image('images/ring.png',(0,0,255,255))
+    stat = os.stat('images/ring.png')
+    os.utime('images/ring.png',ns=(stat.st_atime_ns,stat.st_mtime_ns + 10**9)) #same size png, so make sure the time moves on
+
+    asset_cache = cache.AssetCache(pack_path=pack_path)
+    image = asset_cache.get(key,lambda: load_loose(key))
+    assert image.get_at((0,0)) == (0,0,255,255)
+    assert asset_cache.stats()['pack hits'] == 0
+    assert asset_cache.stats()['pack stale'] == 1
+
+def test_folder_with_a_new_frame_is_stale(tmp_path,monkeypatch):
+    setup_images(tmp_path,monkeypatch)
+    key = ('walk','load_images')
+    path = str(tmp_path / 'folder.pak')
+    write_pack(path,{key: [load_loose(('walk/walk1.png','load_image'))]},cache.source_path)
+    pack = AssetPack(path)
+    assert pack.get(key,cache.source_path(key)) is not None
+
+    save_image('images/walk/walk2.png',(0,0,255,255))
+    assert pack.get(key,cache.source_path(key)) is None
+    assert key in pack.stale
+
+def test_missing_file_is_stale(tmp_path,monkeypatch):
+    setup_images(tmp_path,monkeypatch)
+    key = ('ring.png','load_image')
+    pack = AssetPack(make_pack(tmp_path,[key]))
+
+    os.remove('images/ring.png')
+    assert pack.get(key,cache.source_path(key)) is None
+    assert key in pack.stale
+
+def test_files_that_cannot_be_found_are_not_packed(tmp_path,monkeypatch):
+    setup_images(tmp_path,monkeypatch)
+    key = ('ring.png','load_image')
+    path = str(tmp_path / 'missing.pak')
+    write_pack(path,{key: load_loose(key), ('gone.png','load_image'): load_loose(key)},cache.source_path)
+    assert list(AssetPack(path).entries) == [key]
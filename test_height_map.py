@@ -0,0 +1,63 @@
+import numpy
+
+from tiles import height_map_from_alpha
+
+#The height maps used to be made one pixel at a time, the numpy version has to give exactly the same numbers
+
+size = 64
+
+def per_pixel_height_map(alpha):
+    #The old loop from Tile.image_to_height_array, bitmap is indexed [y][x] like the image
+    bitmap = alpha.T > 20
+    height_map = numpy.zeros(bitmap.shape[1], dtype=int)
+
+    for x, col in enumerate(bitmap.T):
+        for y, is_ground in enumerate(col):
+            if is_ground:
+                height_map[x] = int(y)
+                break
+
+    for i in range(len(height_map)):
+        height_map[i] = 64 - height_map[i]
+    return height_map
+
+def masks():
+    #alpha is indexed [x][y] like surfarray.pixels_alpha
+    flat = numpy.zeros((size,size),dtype=numpy.uint8)
+    flat[:,40:] = 255
+
+    slope = numpy.zeros((size,size),dtype=numpy.uint8)
+    for x in range(size):
+        slope[x,size-1-x:] = 255
+
+    empty = numpy.zeros((size,size),dtype=numpy.uint8)
+    full = numpy.full((size,size),255,dtype=numpy.uint8)
+
+    #faint edge pixels right on the threshold and a floating ledge with a gap under it
+    edges = numpy.zeros((size,size),dtype=numpy.uint8)
+    edges[:,30] = 20
+    edges[:,31] = 21
+    edges[10:20,5:8] = 255
+    edges[40:,50:] = 255
+
+    rng = numpy.random.default_rng(3)
+    noise = rng.integers(0,256,(size,size)).astype(numpy.uint8)
+    noise[rng.random((size,size)) < 0.9] = 0
+
+    return {'flat': flat, 'slope': slope, 'empty': empty, 'full': full, 'edges': edges, 'noise': noise}
+
+def test_height_maps_match_the_per_pixel_loop():
+    for name,alpha in masks().items():
+        assert numpy.array_equal(height_map_from_alpha(alpha,size),per_pixel_height_map(alpha)), f'height map differs for the {name} tile'
+
+def test_width_maps_match_the_per_pixel_loop():
+    #The width map is the height map of the image turned on its side
+    for name,alpha in masks().items():
+        assert numpy.array_equal(height_map_from_alpha(alpha.T,size),per_pixel_height_map(alpha.T)), f'width map differs for the {name} tile'
+
+def test_known_heights():
+    alpha = masks()
+    assert (height_map_from_alpha(alpha['flat'],size) == 24).all()
+    assert (height_map_from_alpha(alpha['full'],size) == 64).all()
+    assert (height_map_from_alpha(alpha['empty'],size) == 64).all() #no ground counts from the top like the old loop
+    assert height_map_from_alpha(alpha['slope'],size).tolist() == list(range(1,65))
@@ -0,0 +1,107 @@
+import numpy
+import pygame
+
+from utilities import tile_size
+from tiles import StaticTile
+from streaming import Chunk
+from static_layers import StaticLayers, strata
+
+#Baked chunks have to look exactly like drawing every static tile on its own
+#The stub tiles are bigger than their 16x16 rects like the sand and palm trees, and only use fully solid or clear pixels
+#so blending through the baked surface gives the same colours
+
+chunk_columns = 8
+columns = 40
+rows = 12
+
+def stub_image(size,seed):
+    rng = numpy.random.default_rng(seed)
+    image = pygame.Surface(size,pygame.SRCALPHA)
+    for x in range(0,size[0],4):
+        for y in range(0,size[1],4):
+            if rng.random() < 0.7:
+                colour = [int(value) for value in rng.integers(0,256,3)]
+                image.fill(colour + [255],(x,y,4,4))
+    return image
+
+class StubCompiled:
+    def __init__(self,layouts):
+        self.layouts = layouts
+
+    def layer(self,name):
+        return self.layouts[name]
+
+class StubCulling:
+    def check(self,layer,rect):
+        return True
+
+class StubStreamer:
+    def __init__(self):
+        self.chunk_columns = chunk_columns
+        self.resident = {}
+
+class StubLevel:
+    def __init__(self,surface):
+        self.display_surface = surface
+        rng = numpy.random.default_rng(1)
+        attributes = [attribute for stratum in strata.values() for attribute in stratum]
+        self.layers = [(attribute,attribute,attribute) for attribute in attributes]
+
+        sizes = [(16,16),(64,64),(48,100),(150,40)] #the last one is wider than a whole chunk
+        self.images = {attribute: [stub_image(size,index*10+number) for number,size in enumerate(sizes)] for index,attribute in enumerate(attributes)}
+
+        layouts = {}
+        for attribute in attributes:
+            layout = rng.integers(0,len(sizes),(rows,columns))
+            layout[rng.random((rows,columns)) < 0.8] = -1
+            layouts[attribute] = layout
+        self.compiled = StubCompiled(layouts)
+
+        self.culling = StubCulling()
+        self.streamer = StubStreamer()
+
+    def create_tile_group(self,layout,type,first_column=0):
+        group = pygame.sprite.Group()
+        for row_index,row in enumerate(layout.tolist()):
+            for col_index,val in enumerate(row,first_column):
+                if val != -1:
+                    sprite = StaticTile(tile_size,col_index*tile_size,row_index*tile_size,self.display_surface,self.images[type][int(val)])
+                    sprite.spawn_key = (type,row_index,col_index)
+                    group.add(sprite)
+        return group
+
+class StubCamera:
+    def __init__(self,x,y):
+        self.offset = pygame.math.Vector2(x,y)
+
+def test_baked_chunks_match_drawing_every_tile():
+    surface = pygame.Surface((200,150),pygame.SRCALPHA)
+    level = StubLevel(surface)
+    static_layers = StaticLayers(level)
+
+    everything = {}
+    for index in range(columns // chunk_columns):
+        chunk = Chunk(index,index*chunk_columns,(index+1)*chunk_columns)
+        for layer,type,attribute in level.layers:
+            layout = level.compiled.layer(layer)[:,chunk.first_column:chunk.last_column]
+            chunk.sprites[attribute] = level.create_tile_group(layout,type,chunk.first_column).sprites()
+            everything.setdefault(attribute,[]).extend(chunk.sprites[attribute])
+        static_layers.bake(chunk)
+        level.streamer.resident[index] = chunk
+
+    for x,y in [(0,0),(37,5),(120,-20),(250,60),(431,17)]:
+        camera = StubCamera(x,y)
+
+        surface.fill((0,152,248,255))
+        for stratum in strata:
+            static_layers.draw(stratum,camera)
+        baked = pygame.image.tobytes(surface,'RGBA')
+
+        surface.fill((0,152,248,255))
+        for stratum,attributes in strata.items():
+            for attribute in attributes:
+                for sprite in sorted(everything[attribute],key=lambda sprite: sprite.spawn_key[1:]):
+                    surface.blit(sprite.image,(sprite.rect.x - x, sprite.rect.y - y))
+        per_tile = pygame.image.tobytes(surface,'RGBA')
+
+        assert baked == per_tile, f'baked chunks differ from per tile drawing at camera offset {(x,y)}'
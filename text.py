@@ -0,0 +1,120 @@
+import pygame
+from collections import OrderedDict
+
+_circle_cache = {}
+
+#This function efficiently generates a list of integer coordinates representing points on the circumference
+#of a circle with radius r using Bresenham's Circle Drawing Algorithm to optimize the calculation process
+def _circlepoints(r):
+    r = int(round(r))
+    if r in _circle_cache:
+        return _circle_cache[r]
+    x, y, e = r, 0, 1 - r
+    _circle_cache[r] = points = []
+    while x >= y:
+        points.append((x, y))
+        y += 1
+        if e < 0:
+            e += 2 * y - 1
+        else:
+            x -= 1
+            e += 2 * (y - x) - 1
+    points += [(y, x) for x, y in points if x > y]
+    points += [(-x, y) for x, y in points if x]
+    points += [(x, -y) for x, y in points if y]
+    points.sort()
+    return points
+
+#Outlined characters of one font in one set of colours, each made once the first time it is used
+#Every glyph keeps its outline and its fill separately so a string can have all the outlines drawn first,
+#then all the fills on top, the same as outlining the whole string at once
+class GlyphAtlas:
+    def __init__(self, font, gfcolor, ocolor, opx):
+        self.font = font
+        self.gfcolor = gfcolor
+        self.ocolor = ocolor
+        self.opx = opx
+        self.glyphs = {} #character --> (outline surface, fill surface)
+
+    def glyph(self, char):
+        if char not in self.glyphs:
+            opx = self.opx
+            fill = self.font.render(char, True, self.gfcolor).convert_alpha()
+            w = fill.get_width() + 2 * opx
+            h = self.font.get_height()
+
+            osurf = pygame.Surface((w, h + 2 * opx), pygame.SRCALPHA)
+            osurf.blit(self.font.render(char, True, self.ocolor).convert_alpha(), (0, 0))
+
+            outline = pygame.Surface((w, h + 2 * opx), pygame.SRCALPHA)
+            for dx, dy in _circlepoints(opx):
+                outline.blit(osurf, (dx + opx, dy + opx))
+
+            self.glyphs[char] = (outline, fill)
+        return self.glyphs[char]
+
+    def render(self, text):
+        #Each glyph is lined up with the right edge of the string up to and including it,
+        #which is where the font puts it when it renders the whole string (kerning and rounding included)
+        opx = self.opx
+        w = self.font.size(text)[0] + 2 * opx
+        h = self.font.get_height()
+
+        surf = pygame.Surface((w, h + 2 * opx), pygame.SRCALPHA)
+        outlines = []
+        fills = []
+        for index, char in enumerate(text):
+            outline, fill = self.glyph(char)
+            x = self.font.size(text[:index+1])[0] - fill.get_width()
+            outlines.append((outline, (x, 0)))
+            fills.append((fill, (x + opx, opx)))
+        surf.blits(outlines, doreturn=False)
+        surf.blits(fills, doreturn=False)
+        return surf
+
+#Rendered strings, so text that is the same as last frame is not built again
+#Least recently used strings are dropped once there are more than max_entries
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.atlases = {} #(font, colours, outline width) --> GlyphAtlas
+        self.entries = OrderedDict() #(text, font, colours, outline width) --> surface
+
+        #counters
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, gfcolor, ocolor, opx):
+        text = '' if text is None else str(text) #font.render draws None as an empty string
+        style = (font, tuple(pygame.Color(gfcolor)), tuple(pygame.Color(ocolor)), opx)
+        key = (text,) + style
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        if style not in self.atlases:
+            self.atlases[style] = GlyphAtlas(font, pygame.Color(gfcolor), pygame.Color(ocolor), opx)
+        surf = self.atlases[style].render(text)
+
+        self.entries[key] = surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def stats(self):
+        return {
+            'strings': len(self.entries),
+            'atlases': len(self.atlases),
+            'glyphs': sum(len(atlas.glyphs) for atlas in self.atlases.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+text_cache = TextCache()
+
+#Outlined text, made from cached glyphs
+#The returned surface is shared so it must not be changed by the caller
+def render(text, font, gfcolor=pygame.Color('white'), ocolor=(0, 0, 0), opx=2):
+    return text_cache.render(text, font, gfcolor, ocolor, opx)
@@ -1,11 +1,27 @@
 import pygame
-import numpy
-from PIL import Image
 from camera import *
 from utilities import *
-from support import import_graphics
+from cache import import_graphics, load_surface
 from game_data import tile_angles
 
+height_threshold = 20 #alpha value a pixel needs to count as ground in the height map
+
+def height_map_from_alpha(alpha,size=64):
+    #alpha is indexed [x][y] like surfarray, so each row of it is one column of the image
+    #Finds the first ground pixel from the top of every column at once
+    #Columns with no ground count as 0 from the top, so they end up as full height like the old loop
+    ground = alpha > height_threshold
+    first = ground.argmax(axis=1)
+    first[~ground.any(axis=1)] = 0
+
+    #Heights go from bottom to top instead
+    return size - first
+
+def drawn_rect(sprite):
+    #The area a tile covers on screen, its image is drawn from the topleft of its rect
+    #Sand and palm tree images are bigger than the 16x16 rect they are placed with, so the rect alone is not enough
+    return sprite.image.get_rect(topleft=sprite.rect.topleft)
+
 class Tile(pygame.sprite.Sprite):
     def __init__(self,size,x,y,display_surface):
         #pos for where, size for how large
@@ -22,57 +38,63 @@ class Tile(pygame.sprite.Sprite):
         self.offset = self.rect.topleft - self.offset #To move it with the camera
         self.display_surface.blit(self.image,self.offset)
 
-class TerrainTile(pygame.sprite.Sprite):
-    def __init__(self,size,x,y,tile_surface,tile_filename):
-        super().__init__()
+#Flyweight for terrain tiles
+#Everything that only depends on the tile image is kept here once per tile image
+#and every TerrainTile placed with that image points at the same object
+class TerrainTileType:
+    def __init__(self,index,name,image,height_map=None,width_map=None,angle_array=None,mask=None):
+        self.index = index #Position of the tile image in the tiles folder, the id used in the csv
+        self.name = name
+        self.image = image
 
-        #General
-        self.tile_size = size
+        #Precomputed values from the compiled level are used when they are passed in
+        self.height_map = height_map
+        self.width_map = width_map
+        if height_map is None or width_map is None:
+            self.image_to_height_array()
 
-        #Image setup
-        self.image = tile_surface #For pygame surface
-        self.image_name = tile_filename #For reference
-        self.image_path = 'levels/level_data/tiles/'+tile_filename #To get path
-        self.image_png = Image.open(self.image_path)
+        self.angle_array = angle_array
+        if angle_array is None:
+            self.set_angle_array(tile_angles)
 
-        #Coordinate positioning
-        self.rect_img = pygame.Surface((size,size))
-        self.rect = self.rect_img.get_rect(topleft = (x,y)) #Positioning of tiles
+        self.mask = mask if mask is not None else pygame.mask.from_surface(image)
 
-        self.set_angle_array(tile_angles)
-        self.image_to_height_array()
-    
     def image_to_height_array(self):
-        #Taking the pixels from the image
-        # pixels where the alpha (transparency) value is not 0, this means that there is no pixel there and it is transparent
-        bitmap = numpy.array(self.image_png)
-
-        bitmap = bitmap[:,:,-1] > 20 #If alpha value > 20 append the pixel to the numpy array
-        self.height_map = numpy.zeros(bitmap.shape[1], dtype=int)
-
-        for x, col in enumerate(bitmap.T): #Go through through the array
-            for y, is_ground in enumerate(col): 
-                if is_ground:
-                    self.height_map[x] = int(y)
-                    break
-
-        #An array of the heights of the pixel value in each 64x64 px square is returned. This goes from top to bottom
-        #Reverse the array so the height is from bottom to top instead
-        for i in range(len(self.height_map)):
-            self.height_map[i] = 64 - self.height_map[i]
-            
-    
+        #Taking the alpha (transparency) values straight from the pygame surface
+        #The width map is the same idea sideways, measured in from the left edge for each row
+        alpha = pygame.surfarray.array_alpha(self.image)
+        self.height_map = height_map_from_alpha(alpha)
+        self.width_map = height_map_from_alpha(alpha.T)
+
     def set_angle_array(self,angle_dict):
         # Get angle of terraformed platforms
         #With respect to image path name
+        self.angle_array = angle_dict.get(self.name, [0]*64) #If not terraformed pad with 0s
+
+class TerrainTile(pygame.sprite.Sprite):
+    def __init__(self,size,x,y,tile_type):
+        super().__init__()
+
+        #General
+        self.tile_size = size
+        self.tile_type = tile_type #Shared image, mask, height map and angles
+
+        #Coordinate positioning
+        self.rect = pygame.Rect(x,y,size,size) #Positioning of tiles
+
+    @property
+    def image(self):
+        return self.tile_type.image
+
+    @property
+    def image_name(self):
+        return self.tile_type.name
 
-        self.angle_array = angle_dict.get(self.image_name, [0]*64) #If not terraformed pad with 0s
-    
     def get_angle_array(self):
-        return (self.angle_array)
+        return (self.tile_type.angle_array)
 
     def get_height_map(self):
-        return (self.height_map)
+        return (self.tile_type.height_map)
     
     def get_rect(self):
         return (self.rect)
@@ -110,12 +132,19 @@ class Rings(AnimatedTile):
     def __init__(self,size,x,y,display_surface,path):
         super().__init__(size,x,y,display_surface,path)
         self.mask = pygame.mask.from_surface(self.image)
+        self.spin_frames = self.frames #kept so reset() can go back to spinning
     
         self.after_frames = [
-            pygame.image.load('levels/level_data/rings/collect/collect1.png').convert_alpha(),
-            pygame.image.load('levels/level_data/rings/collect/collect2.png').convert_alpha(),
+            load_surface('levels/level_data/rings/collect/collect1.png'),
+            load_surface('levels/level_data/rings/collect/collect2.png'),
         ]
     
+    def reset(self):
+        #Resets the ring in place to how it was placed in the level
+        self.frames = self.spin_frames
+        self.frame_index = 0
+        self.image = self.frames[0]
+
     def collect_ring(self):
         self.frames = []
         self.frames = self.collect_images #play collect ring animation
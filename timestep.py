@@ -0,0 +1,56 @@
+import time
+
+#Keeps the level moving at a fixed number of steps a second however fast the screen is drawn
+#The real time between frames is added up and taken off one step at a time,
+#so at 30fps every frame does 2 steps, at 60fps 1 and at 144fps most frames do none
+#If the computer falls too far behind only max_steps are done and the rest is dropped,
+#the game slows down for a moment instead of trying to catch up forever
+class FixedTimestep:
+    def __init__(self,tick_rate=60,max_steps=5):
+        self.step_time = 1 / tick_rate
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.last_time = 0
+
+        #counters
+        self.frames = 0
+        self.steps = 0
+        self.dropped_steps = 0
+        self.catch_up_frames = 0 #frames that did more than one step, so the draws in between were skipped
+
+    def start(self):
+        #Called as a level starts, the first frame always does one step
+        self.accumulator = self.step_time
+        self.last_time = time.perf_counter()
+
+    def advance(self):
+        #Returns how many steps to do this frame
+        now = time.perf_counter()
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int(self.accumulator / self.step_time)
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = self.step_time * steps #only keep the time for the steps being done
+        self.accumulator -= self.step_time * steps
+
+        self.frames += 1
+        self.steps += steps
+        if steps > 1:
+            self.catch_up_frames += 1
+        return steps
+
+    def alpha(self):
+        #How far this frame is between the last step and the next one, 0 to 1
+        return min(1,self.accumulator / self.step_time)
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'steps': self.steps,
+            'steps per frame': round(self.steps / self.frames,2) if self.frames else 0,
+            'catch up frames': self.catch_up_frames,
+            'dropped steps': self.dropped_steps,
+        }
@@ -0,0 +1,73 @@
+import pygame
+import threading
+from collections import OrderedDict
+
+from game_data import sprite_transforms
+
+#Cache for flipped + rotated animation frames, so drawing the player on a slope does not make new surfaces every frame
+#Entries are keyed by (frame surface, flip, angle) with the angle rounded to a step, so similar angles share one entry
+#Least recently used entries are dropped once there are more than max_entries
+#It can be pre-warmed on the level loading thread, so every lookup holds a lock
+class TransformCache:
+    def __init__(self,max_entries=2048,angle_step=1):
+        self.max_entries = max_entries
+        self.angle_step = angle_step
+        self.entries = OrderedDict() #(surface, flip, angle) --> transformed surface
+        self.lock = threading.Lock()
+
+        #counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self,angle):
+        return round(angle / self.angle_step) * self.angle_step % 360
+
+    def get(self,surface,flip,angle):
+        angle = self.quantize(angle)
+        if not flip and angle == 0:
+            return surface #nothing to do, the frame can be drawn as it is
+
+        key = (surface,flip,angle)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+            self.misses += 1
+            image = pygame.transform.rotate(pygame.transform.flip(surface,flip,False),angle)
+            self.entries[key] = image
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return image
+
+    def prewarm(self,surfaces,angles):
+        #Makes the entries for every frame, both ways round, at each of the angles ahead of time
+        #Stops once the cache is full rather than pushing out what it has just made
+        for surface in surfaces:
+            for angle in angles:
+                for flip in (False,True):
+                    if len(self.entries) >= self.max_entries:
+                        return
+                    self.get(surface,flip,angle)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+transform_cache = TransformCache(sprite_transforms['max entries'],sprite_transforms['angle step'])
+
+def transformed(surface,flip,angle):
+    #Same as pygame.transform.rotate(pygame.transform.flip(surface,flip,False),angle) but cached
+    #The returned surface is shared so it must not be changed by the caller
+    return transform_cache.get(surface,flip,angle)
@@ -5,15 +5,19 @@ vertical_tile_number = 32
 tile_size = 16
 
 class Animation:
-    def __init__(self,images,img_duration=5,loop=True):
+    def __init__(self,images,img_duration=5,loop=True,banks=None):
         self.images = images
         self.loop = loop
         self.img_duration = img_duration
         self.done = False
         self.frame = 0 #frame / animation index
+
+        #flip --> frames facing that way, the mirrored frames are only made the first time they are asked for
+        #Shared by every copy so each animation is only ever mirrored once
+        self.banks = banks if banks is not None else {False: images}
     
     def copy(self):
-        return Animation(self.images,self.img_duration,self.loop)
+        return Animation(self.images,self.img_duration,self.loop,self.banks)
     
     def update(self):
         if self.loop:
@@ -23,8 +27,10 @@ class Animation:
             if self.frame >= self.img_duration* len(self.images)-1:
                 self.done = True #if it reaches the end, then stop
 
-    def img(self):
-        return self.images[int(self.frame/self.img_duration)] #dividing frame by how long each image is supposed to show for
+    def img(self,flip=False):
+        if flip not in self.banks:
+            self.banks[flip] = [pygame.transform.flip(image,True,False) for image in self.images]
+        return self.banks[flip][int(self.frame/self.img_duration)] #dividing frame by how long each image is supposed to show for
     
 class Spark:
     def __init__(self,pos,angle,speed):
@@ -76,3 +82,12 @@ class Particle:
     def render(self,surface,offset=(0,0)):
         image = self.animation.img()
         surface.blit(image,(self.pos[0]-offset[0] - image.get_width()//2,self.pos[1]-offset[1]- image.get_height()//2))
+
+    def off_screen(self,surface):
+        #Leaves only fall down and right, so once one is out of view it never comes back
+        return not self.rect().colliderect(surface.get_rect())
+
+    def rect(self,offset=(0,0)):
+        #Area the leaf covers on screen, a pixel bigger each side for the rounding of its position
+        image = self.animation.img()
+        return pygame.Rect(self.pos[0]-offset[0] - image.get_width()//2,self.pos[1]-offset[1]- image.get_height()//2,image.get_width(),image.get_height()).inflate(2,2)